@@ -3,7 +3,8 @@
 import pygame
 from src.viewmanager import ViewManager
 
-
 if __name__ == "__main__":
-    pygame.init()
+    # The mixer is initialized by the sound bank once the first sound is needed
+    pygame.display.init()
+    pygame.font.init()
     ViewManager()
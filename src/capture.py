@@ -0,0 +1,178 @@
+"""Gameplay capture"""
+
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+import pygame
+from src.config import CAPTURE_DIR, CAPTURE_FORMAT, CAPTURE_BUFFER_FRAMES, FPS
+
+# ffmpeg pixel format of 32-bit pixels, from the surface's color masks (red, green, blue)
+PIXEL_FORMATS = {
+    (0xFF0000, 0xFF00, 0xFF): "bgr0",
+    (0xFF, 0xFF00, 0xFF0000): "rgb0",
+}
+
+
+class FrameCapture:
+    """Records finished frames without stalling the game loop.
+
+    Frames are copied straight from the screen's pixel buffer into a ring of
+    preallocated slots, and a worker thread encodes them to an image sequence ("png")
+    or a single raw video file ("raw"). When the worker falls behind and all slots are
+    taken, new frames are dropped and counted instead of waiting for a free slot.
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        output_dir: str,
+        file_format: str = "raw",
+        slots: int = CAPTURE_BUFFER_FRAMES,
+    ) -> None:
+        if screen.get_bytesize() != 4:
+            raise ValueError("Only 32-bit screens can be captured")
+
+        self.size = screen.get_size()
+        self.pitch = screen.get_pitch()
+        self.masks = screen.get_masks()
+        self.video_format = PIXEL_FORMATS[self.masks[:3]]
+        self.file_format = file_format
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        self._slots = [bytearray(self.pitch * self.size[1]) for _ in range(slots)]
+        self._free: queue.SimpleQueue[int] = queue.SimpleQueue()
+        self._filled: queue.SimpleQueue[tuple[int, int, float] | None] = (
+            queue.SimpleQueue()
+        )
+        for index in range(slots):
+            self._free.put(index)
+
+        self.captured = 0
+        self.dropped = 0
+        self.encoded = 0
+
+        self._write_info()
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _write_info(self) -> None:
+        """Describe the recording, including how to turn a raw one into a video"""
+        info = {
+            "size": self.size,
+            "format": self.file_format,
+            "frames": "frames.raw" if self.file_format == "raw" else "frame_*.png",
+            "timestamps": "timestamps.txt",
+        }
+        if self.file_format == "raw":
+            width, height = self.size
+            info["ffmpeg"] = (
+                f"ffmpeg -f rawvideo -pixel_format {self.video_format}"
+                f" -video_size {width}x{height} -framerate {FPS}"
+                f" -i frames.raw capture.mp4"
+            )
+
+        with open(self.output_dir / "capture.json", "w", encoding="utf-8") as file:
+            json.dump(info, file, indent=2)
+
+    def grab(self, screen: pygame.Surface) -> None:
+        """Copy a finished frame into a free slot, or drop it if there is none."""
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+
+        # The buffer locks the surface, so it's released as soon as it has been copied
+        buffer = screen.get_buffer()
+        self._slots[index][:] = memoryview(buffer)
+        del buffer
+
+        self._filled.put((index, self.captured, time.perf_counter()))
+        self.captured += 1
+
+    def _rows(self, slot: bytearray) -> list[memoryview]:
+        """Rows of pixels in slot, without the padding at the end of each row"""
+        view = memoryview(slot)
+        row_bytes = self.size[0] * 4
+        return [
+            view[row * self.pitch : row * self.pitch + row_bytes]
+            for row in range(self.size[1])
+        ]
+
+    def _run(self) -> None:
+        """Worker thread: encodes filled slots in order and frees them again"""
+        row_bytes = self.size[0] * 4
+        raw_file = None
+        image = None
+        if self.file_format == "raw":
+            raw_file = open(self.output_dir / "frames.raw", "wb")
+        else:
+            # Frames are copied into a surface with the screen's pixel format to be saved
+            image = pygame.Surface(self.size, 0, 32, self.masks)
+
+        with open(self.output_dir / "timestamps.txt", "w", encoding="utf-8") as times:
+            while (item := self._filled.get()) is not None:
+                index, number, timestamp = item
+                slot = self._slots[index]
+
+                if image is not None:
+                    pixels = memoryview(image.get_buffer())
+                    if image.get_pitch() == self.pitch:
+                        pixels[:] = slot
+                    else:
+                        pitch = image.get_pitch()
+                        for row_number, row in enumerate(self._rows(slot)):
+                            start = row_number * pitch
+                            pixels[start : start + len(row)] = row
+                    # The surface is locked until its buffer is released
+                    pixels.release()
+                    pygame.image.save(
+                        image, str(self.output_dir / f"frame_{number:06}.png")
+                    )
+                elif self.pitch == row_bytes:
+                    raw_file.write(slot)
+                else:
+                    raw_file.writelines(self._rows(slot))
+
+                times.write(f"{number} {timestamp:.6f}\n")
+                self.encoded += 1
+                self._free.put(index)
+
+        if raw_file is not None:
+            raw_file.close()
+
+    def close(self) -> None:
+        """Wait for the queued frames to be encoded and stop the worker"""
+        if self._thread.is_alive():
+            self._filled.put(None)
+            self._thread.join()
+            print(
+                f"Captured {self.captured} frames, dropped {self.dropped}",
+                file=sys.stderr,
+            )
+
+
+_capture: FrameCapture | None = None
+
+
+def get_capture(screen: object) -> FrameCapture | None:
+    """Get the shared frame capture for screen.
+    Returns None if no CAPTURE_DIR is set, or if the screen can't be captured
+    (under emscripten or with the texture render backend)."""
+    global _capture
+
+    if (
+        _capture is None
+        and CAPTURE_DIR
+        and sys.platform != "emscripten"
+        and isinstance(screen, pygame.Surface)
+    ):
+        _capture = FrameCapture(screen, CAPTURE_DIR, CAPTURE_FORMAT)
+
+    return _capture
@@ -0,0 +1,321 @@
+"""Swept collision tests for road objects, and player-versus-obstacle collision tables"""
+
+import argparse
+import struct
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+import pygame
+from src.config import COLLISION_TABLE_FILE
+from src.snapshot import (
+    OBSTACLE_SKINS,
+    SnapshotError,
+    SnapshotReader,
+    SnapshotWriter,
+    save_snapshot,
+)
+from src.sprites.gameobject import load_sprite_image
+from src.utils import asset_path
+
+PLAYER_SIZE = (75, 75)
+OBSTACLE_SIZE = (64, 64)
+
+TABLE_MAGIC = b"TECT"
+TABLE_VERSION = 1
+_TABLE_HEADER = struct.Struct("<4sB")
+# first and last colliding dy, contact point at the first one
+_INTERVAL = struct.Struct("<hhBB")
+
+# Colliding (first dy, last dy, contact x, contact y) intervals, for each dx
+ContactTable = list[tuple[tuple[int, int, int, int], ...]]
+
+# Masks smeared over the distance an object moved, by (mask, distance)
+_swept_masks: dict[tuple[pygame.mask.Mask, int], pygame.mask.Mask] = {}
+# Column runs of masks, which are shared by all sprites with the same image
+_mask_runs: dict[pygame.mask.Mask, list[list[tuple[int, int]]]] = {}
+
+
+def swept_mask(mask: pygame.mask.Mask, distance: int) -> pygame.mask.Mask:
+    """Mask of everything an object covered while moving distance pixels down.
+    It's distance pixels taller than mask, and is placed distance pixels above the object.
+    Masks are shared by all sprites with the same image, so the result is cached."""
+    if distance <= 0:
+        return mask
+
+    swept = _swept_masks.get((mask, distance))
+    if swept is None:
+        column = pygame.mask.Mask((1, distance + 1), fill=True)
+        swept = _swept_masks[(mask, distance)] = mask.convolve(column)
+
+    return swept
+
+
+def swept_rects_collide(
+    player: pygame.sprite.Sprite, sprite: pygame.sprite.Sprite, distance: int
+) -> bool:
+    """Broadphase: check if the rect sprite swept over while moving distance pixels down
+    overlaps the player's rect"""
+    rect = sprite.rect
+    return player.rect.colliderect(
+        rect.x, rect.y - distance, rect.width, rect.height + distance
+    )
+
+
+def swept_collide(
+    player: pygame.sprite.Sprite, sprite: pygame.sprite.Sprite, distance: int
+) -> bool:
+    """Check if sprite hit the player while moving distance pixels down in the last frame.
+    Only the road objects move vertically, so the player is tested at its current position.
+    The masks are only compared if the swept rects overlap."""
+    if not swept_rects_collide(player, sprite, distance):
+        return False
+
+    rect = sprite.rect
+    offset = (rect.x - player.rect.x, rect.y - distance - player.rect.y)
+    return player.mask.overlap(swept_mask(sprite.mask, distance), offset) is not None
+
+
+def _iter_column_runs(mask: pygame.mask.Mask) -> Iterator[list[tuple[int, int]]]:
+    """First and last row of each run of set bits, for one column of mask after another"""
+    width, height = mask.get_size()
+
+    for x in range(width):
+        runs = []
+        start = None
+        for y in range(height):
+            if mask.get_at((x, y)):
+                if start is None:
+                    start = y
+            elif start is not None:
+                runs.append((start, y - 1))
+                start = None
+
+        if start is not None:
+            runs.append((start, height - 1))
+        yield runs
+
+
+def build_contact_table(
+    player_mask: pygame.mask.Mask, obstacle_mask: pygame.mask.Mask
+) -> ContactTable:
+    """Work out which offsets of an obstacle relative to the player collide.
+
+    The table has an entry for each dx (obstacle x - player x) from -(obstacle width - 1)
+    to player width - 1. Each entry holds the intervals of colliding dy (obstacle y - player y),
+    and the point of the player's mask touched first when the obstacle moves down into them.
+    A player column run [a, b] and an obstacle column run [c, d] above each other
+    collide for every dy from a - d to b - c."""
+    table: ContactTable = []
+    for _ in contact_table_steps(player_mask, obstacle_mask, table):
+        pass
+
+    return table
+
+
+def contact_table_steps(
+    player_mask: pygame.mask.Mask, obstacle_mask: pygame.mask.Mask, table: ContactTable
+) -> Iterator[None]:
+    """Build the table of build_contact_table() into table a little at a time.
+    Yields after each column of a mask is scanned, and after each dx."""
+    player_width = player_mask.get_size()[0]
+    obstacle_width = obstacle_mask.get_size()[0]
+
+    runs_of_masks = []
+    for mask in (player_mask, obstacle_mask):
+        mask_runs = _mask_runs.get(mask)
+        if mask_runs is None:
+            mask_runs = []
+            for column_runs in _iter_column_runs(mask):
+                mask_runs.append(column_runs)
+                yield
+            _mask_runs[mask] = mask_runs
+        runs_of_masks.append(mask_runs)
+
+    player_runs, obstacle_runs = runs_of_masks
+
+    for dx in range(-(obstacle_width - 1), player_width):
+        ranges = []
+        for obstacle_x in range(max(0, -dx), min(obstacle_width, player_width - dx)):
+            for first, last in player_runs[obstacle_x + dx]:
+                for top, bottom in obstacle_runs[obstacle_x]:
+                    ranges.append((first - bottom, last - top))
+
+        ranges.sort()
+        merged: list[list[int]] = []
+        for start, end in ranges:
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        table.append(
+            tuple(
+                (start, end, *player_mask.overlap(obstacle_mask, (dx, start)))
+                for start, end in merged
+            )
+        )
+        yield
+
+
+def _asset_name(file_path: str) -> str:
+    """Path of an asset relative to the assets directory, as stored in table files"""
+    return Path(file_path).relative_to(asset_path("")).as_posix()
+
+
+class CollisionTables:
+    """Player-versus-obstacle collision tables, by (player image, obstacle image).
+
+    Tables are loaded from a file made with `python -m src.collision --bake` if it exists,
+    built in the background with task(), or built the first time they are needed.
+    A collision test is then a lookup and two comparisons per colliding interval."""
+
+    def __init__(self, table_file: str | None = COLLISION_TABLE_FILE) -> None:
+        self.table_file = table_file
+        self._tables: dict[tuple[str, str], ContactTable] = {}
+        self._loaded = False
+        self.built = 0
+
+    def get(self, player_path: str, obstacle_path: str) -> ContactTable:
+        """Get the table for a player and an obstacle image, building it if needed"""
+        if not self._loaded:
+            self.load()
+
+        table = self._tables.get((player_path, obstacle_path))
+        if table is None:
+            player_mask = load_sprite_image(player_path, PLAYER_SIZE)[1]
+            obstacle_mask = load_sprite_image(obstacle_path, OBSTACLE_SIZE)[1]
+            table = build_contact_table(player_mask, obstacle_mask)
+            self._tables[(player_path, obstacle_path)] = table
+            self.built += 1
+
+        return table
+
+    def collide(
+        self,
+        player: pygame.sprite.Sprite,
+        obstacle: pygame.sprite.Sprite,
+        distance: int,
+    ) -> tuple[int, int] | None:
+        """Check if obstacle hit the player while moving distance pixels down in the last frame.
+        Returns the point of the player's mask which was touched first, or None."""
+        if not swept_rects_collide(player, obstacle, distance):
+            return None
+
+        table = self._tables.get((player.img_path, obstacle.img_path))
+        if table is None:
+            table = self.get(player.img_path, obstacle.img_path)
+
+        dx = obstacle.rect.x - player.rect.x + OBSTACLE_SIZE[0] - 1
+        if not 0 <= dx < len(table):
+            return None
+
+        dy = obstacle.rect.y - player.rect.y
+        swept_from = dy - distance
+
+        for start, end, contact_x, contact_y in table[dx]:
+            if start <= dy and end >= swept_from:
+                if start >= swept_from:
+                    return contact_x, contact_y
+
+                # Already touching at the start of the frame
+                return player.mask.overlap(
+                    obstacle.mask, (obstacle.rect.x - player.rect.x, swept_from)
+                )
+
+        return None
+
+    def task(self, player_path: str):
+        """Background task building the tables for a player image and every obstacle skin.
+        Each step scans one mask column or works out one dx, so no step takes more than
+        a fraction of a millisecond. Queue it in the view scheduler when a game starts.
+        """
+        if not self._loaded:
+            self.load()
+
+        player_mask = load_sprite_image(player_path, PLAYER_SIZE)[1]
+
+        for obstacle_path in OBSTACLE_SKINS:
+            key = (player_path, obstacle_path)
+            if key in self._tables:
+                continue
+
+            obstacle_mask = load_sprite_image(obstacle_path, OBSTACLE_SIZE)[1]
+            table: ContactTable = []
+            for _ in contact_table_steps(player_mask, obstacle_mask, table):
+                yield
+                # Built right away in the meantime, because it was needed for a collision
+                if key in self._tables:
+                    break
+            else:
+                self._tables[key] = table
+                self.built += 1
+
+    def load(self) -> None:
+        """Load baked tables, if there are any"""
+        self._loaded = True
+        if not self.table_file:
+            return
+
+        try:
+            data = Path(self.table_file).expanduser().read_bytes()
+        except OSError:
+            return
+
+        reader = SnapshotReader(data)
+        try:
+            magic, version = reader.read(_TABLE_HEADER)
+            if magic != TABLE_MAGIC or version != TABLE_VERSION:
+                raise SnapshotError("Not a collision table file of this version")
+
+            for _ in range(reader.read_count()):
+                player_path = asset_path(reader.read_string())
+                obstacle_path = asset_path(reader.read_string())
+                table = [
+                    tuple(reader.read(_INTERVAL) for _ in range(reader.read_count()))
+                    for _ in range(reader.read_count())
+                ]
+                self._tables.setdefault((player_path, obstacle_path), table)
+        except SnapshotError as err:
+            print(f"Ignoring collision tables: {err}", file=sys.stderr)
+
+    def save(self) -> None:
+        """Write all tables built so far to the table file"""
+        writer = SnapshotWriter()
+        writer.write(_TABLE_HEADER, TABLE_MAGIC, TABLE_VERSION)
+        writer.write_count(len(self._tables))
+
+        for (player_path, obstacle_path), table in self._tables.items():
+            writer.write_string(_asset_name(player_path))
+            writer.write_string(_asset_name(obstacle_path))
+            writer.write_count(len(table))
+            for intervals in table:
+                writer.write_count(len(intervals))
+                for interval in intervals:
+                    writer.write(_INTERVAL, *interval)
+
+        save_snapshot(self.table_file, writer.getvalue())
+
+
+collision_tables = CollisionTables()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Traffic Evader collision tables")
+    parser.add_argument(
+        "--bake",
+        action="store_true",
+        help="build the tables for every player car and obstacle skin",
+    )
+    parser.add_argument("--file", default=COLLISION_TABLE_FILE)
+    args = parser.parse_args()
+
+    if args.bake:
+        # Everything is rebuilt, so tables from an old file aren't loaded
+        tables = CollisionTables(None)
+        tables.table_file = args.file
+        for car_path in sorted(Path(asset_path("sprites/cars")).glob("*.png")):
+            for _ in tables.task(str(car_path)):
+                pass
+
+        tables.save()
+        print(f"Baked {tables.built} collision tables into {args.file}")
@@ -50,3 +50,112 @@ CARS_OBSTACLES = {
         "porsche-911-gt3-rs.png",
     ],
 }
+
+# Metrics
+# (host, port) of a statsd-style collector to stream live metrics to, None disables it.
+# See `python -m src.diagnostics.metrics_receiver` for a local one.
+METRICS_ADDRESS = None
+METRICS_PREFIX = "traffic_evader"
+# Seconds metrics are aggregated over before being sent
+METRICS_WINDOW = 10
+# Largest datagram, small enough not to be fragmented on common networks
+METRICS_MAX_PACKET = 1432
+
+# Garbage collection
+# Gameplay mode: freeze the heap once a view has loaded, and only collect between views while playing
+GC_CONTROL = False
+# How often young objects are collected while collection is paused while playing
+GC_YOUNG_INTERVAL = 5
+
+# Diagnostics
+DEBUG_MEMORY = False
+MEMORY_REPORT_INTERVAL = 10
+MEMORY_BUDGET = 32 * 1024 * 1024
+DEBUG_ALLOCATIONS = False
+# Print how long inputs take to show up on screen after each view
+DEBUG_INPUT_LATENCY = False
+
+# Frame pacing
+# "classic": handle input, update and render, then wait for the next frame.
+# "late": wait for the next frame first, so input is read right before it's used.
+FRAME_PACING = "classic"
+# Wait for the next frame by busy looping, which is more precise but keeps a core busy
+PACING_BUSY_WAIT = False
+# Wait for the display's refresh when showing a frame (uses a scaled window)
+VSYNC = False
+
+# Window
+# The game is always drawn at WIDTH x HEIGHT, and scaled up to fit a window of this size.
+# None shows it unscaled.
+WINDOW_SIZE = None
+FULLSCREEN = False
+# "nearest" keeps the pixel art sharp when scaling, "linear" smooths it
+SCALE_QUALITY = "nearest"
+
+# Rendering
+# "software" blits onto the display surface, "texture" draws with the SDL2 Renderer
+RENDER_BACKEND = "software"
+# Use SDL's software renderer for the texture backend (e.g. on machines without a GPU)
+RENDER_ACCELERATED = True
+
+# Traffic
+# Objects are spawned this far above the screen
+SPAWN_DISTANCE = 400
+# Road planned in advance, beyond SPAWN_DISTANCE
+TRAFFIC_LOOKAHEAD = 3 * HEIGHT
+# Length of road planned in one go
+TRAFFIC_SEGMENT = 300
+# Chance of a designed pattern being placed in a segment
+TRAFFIC_PATTERN_CHANCE = 0.15
+
+# Leaderboard
+# Base URL of the leaderboard server, e.g. "http://127.0.0.1:8765". None disables it.
+LEADERBOARD_URL = None
+LEADERBOARD_PLAYER_NAME = "Player"
+LEADERBOARD_TOP = 5
+# Results which couldn't be sent yet are kept here between restarts
+LEADERBOARD_QUEUE_FILE = "~/.traffic-evader/leaderboard-queue.json"
+LEADERBOARD_BATCH_SIZE = 20
+LEADERBOARD_TIMEOUT = 5
+# Seconds to wait before retrying, doubled after every failure up to the max
+LEADERBOARD_RETRY_MIN = 2
+LEADERBOARD_RETRY_MAX = 300
+
+# Collision
+# Player-versus-obstacle collision tables made with `python -m src.collision --bake`,
+# loaded at the start if the file exists. Missing tables are built while playing.
+COLLISION_TABLE_FILE = "~/.traffic-evader/collision-tables.bin"
+
+# Sound
+MIXER_FREQUENCY = 44100
+# Samples per mixer buffer, smaller is lower latency but needs more CPU
+MIXER_BUFFER = 512
+# Mixer channels reserved for each sound category, which is also how many of its sounds can play at once
+SOUND_CHANNELS = {"ui": 2, "pickup": 2, "effect": 1}
+# Seconds in which repeated triggers of a sound are merged into one
+SOUND_MERGE_WINDOW = 0.08
+
+# Split simulation
+# Simulate the game in a separate process, which only leaves drawing to this one.
+# Not available under emscripten.
+SPLIT_PROCESSES = False
+# Coins and obstacles each, which can be passed on to be drawn
+SPLIT_MAX_OBJECTS = 128
+
+# Split screen
+# Keys (pygame key names) steering left and right, for each player of a split screen game.
+# Up to as many players as there are key pairs can play at once.
+SPLIT_SCREEN_KEYS = (("a", "d"), ("left", "right"), ("j", "l"), ("[4]", "[6]"))
+
+# Snapshots
+# A game quit while running is saved here, and resumed when a game with
+# the same difficulty and car is started next time. None disables it.
+SNAPSHOT_FILE = "~/.traffic-evader/snapshot.bin"
+
+# Capture
+# Directory to record the shown frames into, None disables capturing
+CAPTURE_DIR = None
+# "raw" writes one raw video file, "png" an image sequence (see capture.json in CAPTURE_DIR)
+CAPTURE_FORMAT = "raw"
+# Frames which can wait for the encoder before new ones are dropped
+CAPTURE_BUFFER_FRAMES = 30
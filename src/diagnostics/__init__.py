@@ -0,0 +1,6 @@
+"""Diagnostics for Traffic Evader"""
+
+from .allocations import AllocationProbe, allocations
+from .latency import InputLatencyProbe, input_latency
+from .memory import MemoryTracker, memory
+from .metrics import MetricsEmitter, get_metrics
@@ -0,0 +1,76 @@
+"""Per-frame allocation checks"""
+
+import tracemalloc
+
+
+class AllocationProbe:
+    """Measures the memory allocated by each frame of the game loop, using tracemalloc.
+
+    Net growth is memory a frame keeps allocated (objects created and kept alive),
+    which should stay at zero while playing. Peak is memory only used during the frame.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+        self._start_bytes = 0
+
+    def reset(self) -> None:
+        """Forget all measured frames"""
+        self.frames = 0
+        self.growing_frames = 0
+        self.net_bytes = 0
+        self.max_net_bytes = 0
+        self.max_peak_bytes = 0
+
+    def frame_begin(self) -> None:
+        """Call before the frame's work starts"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def frame_end(self) -> None:
+        """Call when the frame's work is done"""
+        current, peak = tracemalloc.get_traced_memory()
+        net_bytes = current - self._start_bytes
+
+        self.frames += 1
+        self.net_bytes += net_bytes
+        self.max_net_bytes = max(self.max_net_bytes, net_bytes)
+        self.max_peak_bytes = max(self.max_peak_bytes, peak - self._start_bytes)
+
+        if net_bytes > 0:
+            self.growing_frames += 1
+
+    def report(self) -> dict:
+        """Summary of the measured frames"""
+        frames = max(self.frames, 1)
+        return {
+            "frames": self.frames,
+            "growing_frames": self.growing_frames,
+            "avg_net_bytes": self.net_bytes / frames,
+            "max_net_bytes": self.max_net_bytes,
+            "max_peak_bytes": self.max_peak_bytes,
+        }
+
+    def format_report(self, name: str) -> str:
+        """Human readable version of report(). name is the measured view."""
+        report = self.report()
+        lines = [
+            f"Allocations in {name}: {report['frames']} frames,"
+            f" {report['avg_net_bytes']:.1f} B kept per frame, max {report['max_net_bytes']} B kept"
+            f" and {report['max_peak_bytes']} B peak in a frame"
+        ]
+
+        # Pools and queues grow now and then, memory kept by most frames is a leak
+        if report["growing_frames"] > report["frames"] / 2:
+            lines.append(
+                f"  WARNING: memory grew in {report['growing_frames']} frames,"
+                " something is allocated on every frame"
+            )
+
+        return "\n".join(lines)
+
+
+allocations = AllocationProbe()
@@ -0,0 +1,109 @@
+"""Input-to-display latency measurement"""
+
+import pygame
+
+# Events a player waits to see the reaction to
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)
+
+
+def _stats(samples: list[int], prefix: str = "") -> dict:
+    """mean, p50, p95 and max of samples, with their names prefixed"""
+    samples = sorted(samples)
+    return {
+        f"{prefix}mean_ms": sum(samples) / len(samples),
+        f"{prefix}p50_ms": samples[len(samples) // 2],
+        f"{prefix}p95_ms": samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+        f"{prefix}max_ms": samples[-1],
+    }
+
+
+class InputLatencyProbe:
+    """Measures the time from an input event arriving to the flip of the first frame drawn after
+    it was handled.
+
+    Times are SDL ticks. pygame doesn't tell when SDL received an event, so the queue is
+    observed at a few points of every frame (before and after waiting for the next one, and
+    when events are taken off it). An event arrived after the last observation which found
+    no input queued, and before the first one which found it. Both bounds are reported:
+    the lower one from when it was first seen, the upper one from the last empty queue.
+    Events which carry their own timestamp are measured exactly."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all measurements"""
+        self.samples: list[int] = []
+        self.upper_samples: list[int] = []
+        # (first seen, last empty queue before) of the oldest event waiting to be shown
+        self._pending: tuple[int, int] | None = None
+        self._empty_at = pygame.time.get_ticks()
+        self._seen_at: int | None = None
+
+    def observe(self) -> None:
+        """Call after pumping events, to narrow down when input arrived"""
+        now = pygame.time.get_ticks()
+        if pygame.event.peek(INPUT_EVENTS):
+            if self._seen_at is None:
+                self._seen_at = now
+        else:
+            self._empty_at = now
+            self._seen_at = None
+
+    def input(self, event: pygame.event.Event) -> None:
+        """Call for every event handled by a view"""
+        if event.type not in INPUT_EVENTS:
+            return
+
+        timestamp = getattr(event, "timestamp", None)
+        if timestamp:
+            received = (timestamp, timestamp)
+        else:
+            seen = pygame.time.get_ticks() if self._seen_at is None else self._seen_at
+            received = (seen, min(self._empty_at, seen))
+
+        # Only the oldest event waiting to be shown is timed
+        if self._pending is None or received < self._pending:
+            self._pending = received
+
+    def taken(self) -> None:
+        """Call after taking all events off the queue"""
+        self._empty_at = pygame.time.get_ticks()
+        self._seen_at = None
+
+    def presented(self) -> None:
+        """Call right after a frame has been flipped"""
+        if self._pending is not None:
+            now = pygame.time.get_ticks()
+            seen, empty = self._pending
+            self.samples.append(now - seen)
+            self.upper_samples.append(now - empty)
+            self._pending = None
+
+    def report(self) -> dict:
+        """Latency statistics in milliseconds, the upper bounds prefixed with "upper_" """
+        if not self.samples:
+            return {"samples": 0}
+
+        return {
+            "samples": len(self.samples),
+            **_stats(self.samples),
+            **_stats(self.upper_samples, "upper_"),
+        }
+
+    def format_report(self, name: str) -> str:
+        """Human readable version of report(), for the view called name"""
+        report = self.report()
+        if not report["samples"]:
+            return f"Input latency in {name}: no input"
+
+        return (
+            f"Input latency in {name}: {report['samples']} inputs,"
+            f" mean {report['mean_ms']:.1f}-{report['upper_mean_ms']:.1f} ms,"
+            f" p50 {report['p50_ms']}-{report['upper_p50_ms']} ms,"
+            f" p95 {report['p95_ms']}-{report['upper_p95_ms']} ms,"
+            f" max {report['max_ms']}-{report['upper_max_ms']} ms"
+        )
+
+
+input_latency = InputLatencyProbe()
@@ -0,0 +1,165 @@
+"""Surface, mask and sound memory accounting"""
+
+import gc
+import sys
+import weakref
+import pygame
+from src.config import MEMORY_BUDGET
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    """Bytes of pixel data held by a surface.
+    Subsurfaces share their parent's pixels, so they don't hold any of their own."""
+    if surface.get_parent() is not None:
+        return 0
+
+    return surface.get_pitch() * surface.get_height()
+
+
+def mask_bytes(mask: pygame.mask.Mask) -> int:
+    """Bytes held by a mask, which stores each row as 64-bit words"""
+    width, height = mask.get_size()
+    return (width + 63) // 64 * 8 * height
+
+
+def sound_bytes(sound: pygame.mixer.Sound) -> int:
+    """Bytes of decoded sample data held by a sound"""
+    mixer_format = pygame.mixer.get_init()
+    if not mixer_format:
+        return 0
+
+    frequency, size, channels = mixer_format
+    return round(sound.get_length() * frequency) * channels * (abs(size) // 8)
+
+
+def _owned_values(owner: object):
+    """Attributes of owner, including the values of dict attributes (e.g. a bank of sounds)"""
+    for value in vars(owner).values():
+        if isinstance(value, dict):
+            yield from value.values()
+        else:
+            yield value
+
+
+class MemoryTracker:
+    """Keeps track of objects owning surfaces, masks and sound buffers.
+
+    Owners are referenced weakly and are tagged with the view they were created in,
+    so objects still alive after their view has ended can be flagged as leaks.
+    Memory is counted from the owners' attributes when a report is made."""
+
+    def __init__(self, budget: int = MEMORY_BUDGET) -> None:
+        self.budget = budget
+        self._owners: weakref.WeakKeyDictionary[object, tuple[int, str]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._view_names: dict[int, str] = {}
+        self._generation = 0
+        self.leaks: list[str] = []
+
+    def track(self, owner: object, asset: str = "") -> None:
+        """Start tracking the surfaces, masks and sounds referenced by owner.
+        asset is an optional label (e.g. the file the owner's image was loaded from)."""
+        self._owners[owner] = (self._generation, asset)
+
+    def begin_view(self, name: str) -> int:
+        """Tag all objects tracked from now on as belonging to a new view.
+        Returns the tag, to be passed to check_leaks() once the view has ended."""
+        self._generation += 1
+        self._view_names[self._generation] = name
+        return self._generation
+
+    def check_leaks(self, generation: int) -> list[str]:
+        """Flag tracked objects created in an ended view which are still alive.
+        Only call this after all references to the view itself are dropped."""
+        gc.collect()
+        view_name = self._view_names.pop(generation, "?")
+
+        leaked = [
+            f"{type(owner).__name__}({asset}) outlived view {view_name}"
+            for owner, (owner_generation, asset) in list(self._owners.items())
+            if owner_generation == generation
+        ]
+        self.leaks.extend(leaked)
+        return leaked
+
+    def report(self) -> dict:
+        """Count live surfaces, masks and sounds by owner type and by asset.
+        Objects shared between owners are only counted once."""
+        seen: set[int] = set()
+        by_owner: dict[str, dict[str, int]] = {}
+        by_asset: dict[str, int] = {}
+        total = 0
+
+        for owner, (_, asset) in list(self._owners.items()):
+            entry = by_owner.setdefault(
+                type(owner).__name__,
+                {"owners": 0, "surfaces": 0, "masks": 0, "sounds": 0, "bytes": 0},
+            )
+            entry["owners"] += 1
+
+            for value in _owned_values(owner):
+                if id(value) in seen:
+                    continue
+
+                if isinstance(value, pygame.Surface):
+                    size = surface_bytes(value)
+                    entry["surfaces"] += 1
+                elif isinstance(value, pygame.mask.Mask):
+                    size = mask_bytes(value)
+                    entry["masks"] += 1
+                elif isinstance(value, pygame.mixer.Sound):
+                    size = sound_bytes(value)
+                    entry["sounds"] += 1
+                else:
+                    continue
+
+                seen.add(id(value))
+                entry["bytes"] += size
+                total += size
+                if asset:
+                    by_asset[asset] = by_asset.get(asset, 0) + size
+
+        return {
+            "total_bytes": total,
+            "budget_bytes": self.budget,
+            "over_budget": total > self.budget,
+            "by_owner": by_owner,
+            "by_asset": by_asset,
+            "leaks": list(self.leaks),
+        }
+
+    def format_report(self) -> str:
+        """Human readable version of report()"""
+        report = self.report()
+        lines = [
+            f"Memory: {report['total_bytes'] / 1024:.1f} KiB tracked"
+            f" (budget {report['budget_bytes'] / 1024:.0f} KiB)"
+        ]
+
+        if report["over_budget"]:
+            lines.append("  WARNING: memory budget exceeded")
+
+        for owner_type, entry in sorted(
+            report["by_owner"].items(), key=lambda item: -item[1]["bytes"]
+        ):
+            lines.append(
+                f"  {owner_type}: {entry['owners']} owners, {entry['surfaces']} surfaces,"
+                f" {entry['masks']} masks, {entry['sounds']} sounds,"
+                f" {entry['bytes'] / 1024:.1f} KiB"
+            )
+
+        for leak in report["leaks"]:
+            lines.append(f"  LEAK: {leak}")
+
+        return "\n".join(lines)
+
+    def periodic_report(self, interval: float):
+        """Background task printing a report every interval seconds.
+        Meant to be queued in the view scheduler in debug mode."""
+        while True:
+            yield interval
+            print(self.format_report(), file=sys.stderr)
+
+
+memory = MemoryTracker()
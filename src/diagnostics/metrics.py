@@ -0,0 +1,140 @@
+"""Live metrics, streamed as statsd datagrams"""
+
+import socket
+import sys
+import time
+from array import array
+from src.config import (
+    FPS,
+    METRICS_ADDRESS,
+    METRICS_PREFIX,
+    METRICS_WINDOW,
+    METRICS_MAX_PACKET,
+)
+
+
+class MetricsEmitter:
+    """Aggregates metrics over fixed windows and sends them to a statsd-style collector.
+
+    Frame times are stored in a preallocated array, and counters and gauges in dicts,
+    so recording costs the same every frame. Once per window they are turned into
+    statsd lines ("name:value|type") and sent in as few UDP datagrams as possible,
+    from a non-blocking socket. Datagrams which can't be sent are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        prefix: str = METRICS_PREFIX,
+        window: float = METRICS_WINDOW,
+    ) -> None:
+        self.address = address
+        self.prefix = prefix
+        self.window = window
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+        # Twice the frames a window should have, in case the game runs faster
+        self._frame_times = array("d", [0.0]) * int(window * FPS * 2)
+        self._frames = 0
+        self._counters: dict[str, int] = {}
+        self._gauges: dict[str, float] = {}
+        self._totals: dict[str, int] = {}
+        self._window_start = time.perf_counter()
+
+        self.sent_packets = 0
+        self.dropped_packets = 0
+
+    def frame(self, frame_time: float) -> None:
+        """Record the time a frame's work took, in seconds"""
+        if self._frames < len(self._frame_times):
+            self._frame_times[self._frames] = frame_time
+        self._frames += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter, which is reset every window"""
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def count_total(self, name: str, total: int) -> None:
+        """Count the increase of a running total (e.g. an object's own counter) since last time"""
+        previous = self._totals.get(name, 0)
+        self._totals[name] = total
+        # A total which went down belongs to a new object, which started from 0
+        self.count(name, total - previous if total >= previous else total)
+
+    def gauge(self, name: str, value: float) -> None:
+        """Set a value, of which the latest one is sent at the end of the window"""
+        self._gauges[name] = value
+
+    def window_due(self) -> bool:
+        """Check if the current window is over and should be flushed"""
+        return time.perf_counter() - self._window_start >= self.window
+
+    def time_left(self) -> float:
+        """Seconds until the current window is over"""
+        return max(self._window_start + self.window - time.perf_counter(), 0.0)
+
+    def _lines(self, elapsed: float) -> list[str]:
+        """statsd lines for the current window"""
+        prefix = self.prefix
+        lines = [f"{prefix}.fps:{self._frames / elapsed:.2f}|g"]
+
+        recorded = min(self._frames, len(self._frame_times))
+        if recorded:
+            frame_times = sorted(self._frame_times[:recorded])
+            for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                value = frame_times[min(int(recorded * fraction), recorded - 1)]
+                lines.append(f"{prefix}.frame_time.{name}:{value * 1000:.3f}|g")
+            lines.append(f"{prefix}.frame_time.max:{frame_times[-1] * 1000:.3f}|g")
+
+        lines += [
+            f"{prefix}.{name}:{value}|c" for name, value in self._counters.items()
+        ]
+        lines += [f"{prefix}.{name}:{value}|g" for name, value in self._gauges.items()]
+        return lines
+
+    def flush(self) -> None:
+        """Send the current window's metrics and start a new window"""
+        now = time.perf_counter()
+        lines = self._lines(max(now - self._window_start, 1e-9))
+
+        packet = ""
+        for line in lines:
+            if packet and len(packet) + 1 + len(line) > METRICS_MAX_PACKET:
+                self._send(packet)
+                packet = ""
+            packet = f"{packet}\n{line}" if packet else line
+
+        if packet:
+            self._send(packet)
+
+        self._frames = 0
+        self._counters.clear()
+        # Gauges are set again for every window, so ones which no longer apply aren't sent
+        self._gauges.clear()
+        self._window_start = now
+
+    def _send(self, packet: str) -> None:
+        """Send one datagram without blocking"""
+        try:
+            self._socket.sendto(packet.encode(), self.address)
+            self.sent_packets += 1
+        except OSError:
+            # Also raised while nothing listens on the port, which is fine for UDP
+            self.dropped_packets += 1
+
+
+_emitter: MetricsEmitter | None = None
+
+
+def get_metrics() -> MetricsEmitter | None:
+    """Get the shared metrics emitter.
+    Returns None if no METRICS_ADDRESS is set, or under emscripten (which has no UDP sockets).
+    """
+    global _emitter
+
+    if _emitter is None and METRICS_ADDRESS and sys.platform != "emscripten":
+        _emitter = MetricsEmitter(METRICS_ADDRESS)
+
+    return _emitter
@@ -0,0 +1,42 @@
+"""A local receiver for the metrics of MetricsEmitter, to test it without a real collector.
+
+Run with `python -m src.diagnostics.metrics_receiver` and set METRICS_ADDRESS to ("127.0.0.1", 8125).
+"""
+
+import argparse
+import socket
+
+
+def parse_line(line: str) -> tuple[str, float, str]:
+    """Split a statsd line into its name, value and type"""
+    name, rest = line.split(":", 1)
+    value, metric_type = rest.split("|", 1)
+    return name, float(value), metric_type
+
+
+def listen(port: int = 8125, host: str = "127.0.0.1") -> socket.socket:
+    """Create a socket receiving metrics on host:port"""
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind((host, port))
+    return receiver
+
+
+def receive(receiver: socket.socket) -> list[tuple[str, float, str]]:
+    """Wait for the next datagram, and parse the metrics in it"""
+    data, _ = receiver.recvfrom(65536)
+    return [parse_line(line) for line in data.decode().splitlines() if line]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print metrics sent by Traffic Evader")
+    parser.add_argument("--port", type=int, default=8125)
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+
+    metrics_socket = listen(args.port, args.host)
+    print(f"Receiving metrics on {args.host}:{args.port}")
+
+    while True:
+        for metric_name, metric_value, metric_type in receive(metrics_socket):
+            print(f"{metric_name:<40} {metric_value:>12g} {metric_type}")
+        print()
@@ -0,0 +1,287 @@
+"""Display backends"""
+
+import os
+import sys
+import weakref
+import pygame
+from src.config import (
+    WIDTH,
+    HEIGHT,
+    RENDER_BACKEND,
+    RENDER_ACCELERATED,
+    WINDOW_SIZE,
+    FULLSCREEN,
+    SCALE_QUALITY,
+    VSYNC,
+    DEBUG_INPUT_LATENCY,
+)
+from src.diagnostics import input_latency
+
+
+class TextureScreen:
+    """A draw target backed by the SDL2 Renderer instead of the display surface.
+
+    Surfaces blitted onto it are uploaded as textures the first time they are drawn,
+    and drawn from those textures afterwards. Surfaces must therefore not be changed
+    after being drawn, draw from another area of a sheet or use a new surface instead.
+    Implements the part of the pygame.Surface API used by sprites, UI elements and views.
+    Everything is drawn at size, and scaled by the renderer to fit a window of window_size.
+    """
+
+    def __init__(
+        self,
+        size: tuple[int, int],
+        accelerated: bool = True,
+        window_size: tuple[int, int] | None = None,
+        fullscreen: bool = False,
+    ) -> None:
+        # pygame._sdl2 isn't available on every platform, so it's imported on demand
+        from pygame._sdl2.video import Window, Renderer, Texture
+
+        self._texture_type = Texture
+        self.window = Window(
+            "Traffic Evader",
+            window_size or size,
+            resizable=window_size is not None,
+            fullscreen_desktop=fullscreen,
+        )
+        self.renderer = Renderer(
+            self.window, accelerated=1 if accelerated else 0, vsync=VSYNC
+        )
+        # Mouse events are translated to logical coordinates by SDL as well
+        self.renderer.logical_size = size
+        self._size = size
+        self._textures: weakref.WeakKeyDictionary[pygame.Surface, Texture] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._kept_frame: pygame.Surface | None = None
+
+    def get_size(self) -> tuple[int, int]:
+        """Size of the screen, like pygame.Surface.get_size()"""
+        return self._size
+
+    def get_width(self) -> int:
+        """Width of the screen, like pygame.Surface.get_width()"""
+        return self._size[0]
+
+    def get_height(self) -> int:
+        """Height of the screen, like pygame.Surface.get_height()"""
+        return self._size[1]
+
+    def get_rect(self, **kwargs) -> pygame.Rect:
+        """Rect of the screen, like pygame.Surface.get_rect()"""
+        rect = pygame.Rect((0, 0), self._size)
+        for attribute, value in kwargs.items():
+            setattr(rect, attribute, value)
+
+        return rect
+
+    def texture(self, surface: pygame.Surface):
+        """Get the texture for a surface, uploading it if needed."""
+        texture = self._textures.get(surface)
+
+        if texture is None:
+            texture = self._texture_type.from_surface(self.renderer, surface)
+            self._textures[surface] = texture
+
+        return texture
+
+    def blit(
+        self,
+        source: pygame.Surface,
+        dest: pygame.Rect | tuple[int, int],
+        area: pygame.Rect | tuple[int, int, int, int] | None = None,
+    ) -> pygame.Rect:
+        """Draw source (or the area of it) at dest, like pygame.Surface.blit()"""
+        if area is None:
+            width, height = source.get_size()
+        else:
+            area = pygame.Rect(area)
+            width, height = area.size
+
+        dest_rect = pygame.Rect(dest[0], dest[1], width, height)
+        self.texture(source).draw(area, dest_rect)
+        return dest_rect
+
+    def fill(
+        self,
+        color: pygame.Color | tuple | str,
+        rect: pygame.Rect | tuple[int, int, int, int] | None = None,
+    ) -> None:
+        """Fill the screen (or rect) with a solid color, like pygame.Surface.fill()"""
+        self.renderer.draw_color = pygame.Color(color)
+
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(rect)
+
+    def keep_frame(self) -> None:
+        """Read back what has been drawn so far, for copy(). This is slow.
+        Has to be done before present(), as the drawn frame is undefined afterwards."""
+        self._kept_frame = self.renderer.to_surface()
+
+    def copy(self) -> pygame.Surface:
+        """Get the frame kept by keep_frame() as a surface, or a blank one if none was kept"""
+        frame, self._kept_frame = self._kept_frame, None
+        if frame is None:
+            frame = pygame.Surface(self._size)
+            frame.fill((255, 255, 255))
+
+        return frame
+
+    def set_viewport(self, rect: pygame.Rect | None) -> None:
+        """Draw relative to and clipped to rect from now on, or to the whole screen for None"""
+        self.renderer.set_viewport(rect)
+
+    def present(self) -> None:
+        """Show the drawn frame"""
+        self.renderer.present()
+
+
+class Viewport:
+    """A rectangle of the screen, which is drawn onto like a screen of its own.
+
+    Draws are moved by -camera, so the part of the game world starting at camera is shown,
+    and clipped to the rectangle. Draw between begin() and end(), so the texture backend
+    can clip as well. Several viewports share the screen, and are shown with one present().
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface | TextureScreen,
+        rect: pygame.Rect | tuple[int, int, int, int],
+        camera: tuple[int, int] = (0, 0),
+    ) -> None:
+        self.screen = screen
+        self.rect = pygame.Rect(rect)
+        self.camera = camera
+
+        # A subsurface shares the screen's pixels, and clips to and draws relative to rect
+        self._target = (
+            screen
+            if isinstance(screen, TextureScreen)
+            else screen.subsurface(self.rect)
+        )
+
+    def get_size(self) -> tuple[int, int]:
+        """Size of the viewport, like pygame.Surface.get_size()"""
+        return self.rect.size
+
+    def begin(self) -> None:
+        """Start drawing onto this viewport"""
+        if isinstance(self._target, TextureScreen):
+            self._target.set_viewport(self.rect)
+
+    def end(self) -> None:
+        """Stop drawing onto this viewport"""
+        if isinstance(self._target, TextureScreen):
+            self._target.set_viewport(None)
+
+    def blit(
+        self,
+        source: pygame.Surface,
+        dest: pygame.Rect | tuple[int, int],
+        area: pygame.Rect | tuple[int, int, int, int] | None = None,
+    ) -> pygame.Rect:
+        """Draw source (or the area of it) at dest in the game world, like pygame.Surface.blit()"""
+        return self._target.blit(
+            source, (dest[0] - self.camera[0], dest[1] - self.camera[1]), area
+        )
+
+    def fill(self, color: pygame.Color | tuple | str) -> None:
+        """Fill the whole viewport with a solid color"""
+        if isinstance(self._target, TextureScreen):
+            # Relative to the viewport, which is set while drawing
+            self._target.fill(color, ((0, 0), self.rect.size))
+        else:
+            self._target.fill(color)
+
+
+_texture_screen: TextureScreen | None = None
+
+
+def get_screen() -> pygame.Surface | TextureScreen:
+    """Get the draw target for the configured render backend.
+    Falls back to the display surface if the texture backend can't be used."""
+    global _texture_screen
+
+    if _texture_screen is not None:
+        return _texture_screen
+
+    # Read by SDL when the scaled screen's textures are created
+    os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", SCALE_QUALITY)
+
+    if RENDER_BACKEND == "texture" and sys.platform != "emscripten":
+        try:
+            _texture_screen = TextureScreen(
+                (WIDTH, HEIGHT), RENDER_ACCELERATED, WINDOW_SIZE, FULLSCREEN
+            )
+            return _texture_screen
+        except (ImportError, pygame.error) as err:
+            print(
+                f"Texture rendering unavailable, using software rendering: {err}",
+                file=sys.stderr,
+            )
+
+    if pygame.display.get_active():
+        return pygame.display.get_surface()
+
+    if not WINDOW_SIZE and not FULLSCREEN and not VSYNC:
+        return pygame.display.set_mode((WIDTH, HEIGHT))
+
+    # SDL scales the screen to the window in one pass when the frame is shown,
+    # and translates mouse positions back to screen coordinates.
+    # Vsync is only available for scaled windows.
+    flags = pygame.SCALED | (pygame.FULLSCREEN if FULLSCREEN else pygame.RESIZABLE)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), flags, vsync=1 if VSYNC else 0)
+
+    if WINDOW_SIZE and not FULLSCREEN:
+        _resize_window(WINDOW_SIZE)
+
+    return screen
+
+
+def _resize_window(size: tuple[int, int]) -> None:
+    """Resize the window of the scaled display surface"""
+    try:
+        from pygame._sdl2.video import Window
+
+        Window.from_display_module().size = size
+    except (ImportError, pygame.error) as err:
+        print(f"Could not resize the window: {err}", file=sys.stderr)
+
+
+def present(keep_frame: bool = False) -> None:
+    """Show the frame drawn onto the screen from get_screen().
+    With keep_frame, the frame can be copied from the screen afterwards (e.g. by the next view).
+    """
+    if _texture_screen is not None:
+        if keep_frame:
+            _texture_screen.keep_frame()
+        _texture_screen.present()
+    else:
+        pygame.display.flip()
+
+    if DEBUG_INPUT_LATENCY:
+        input_latency.presented()
+
+
+def set_caption(title: str) -> None:
+    """Set the window title"""
+    if _texture_screen is not None:
+        _texture_screen.window.title = title
+    else:
+        pygame.display.set_caption(title)
+
+
+def load_image(file_path: str) -> pygame.Surface:
+    """Load an image with per-pixel alpha.
+    It's only converted to the display's pixel format when there is a display surface,
+    as the texture backend draws onto a window without one."""
+    image = pygame.image.load(file_path)
+
+    if pygame.display.get_surface() is None:
+        return image
+
+    return image.convert_alpha()
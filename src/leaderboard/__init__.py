@@ -0,0 +1,9 @@
+"""Online leaderboard for Traffic Evader"""
+
+from .client import (
+    LeaderboardClient,
+    LeaderboardError,
+    LeaderboardRejected,
+    LEADERBOARD_UPDATED,
+    get_client,
+)
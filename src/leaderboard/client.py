@@ -0,0 +1,311 @@
+"""Leaderboard client"""
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+import pygame
+from src.config import (
+    LEADERBOARD_URL,
+    LEADERBOARD_QUEUE_FILE,
+    LEADERBOARD_BATCH_SIZE,
+    LEADERBOARD_TIMEOUT,
+    LEADERBOARD_RETRY_MIN,
+    LEADERBOARD_RETRY_MAX,
+)
+
+# Posted when new top scores have been fetched
+LEADERBOARD_UPDATED = pygame.event.custom_type()
+# Client errors which may succeed when retried later
+RETRYABLE_STATUSES = (408, 429)
+
+
+class LeaderboardError(Exception):
+    """Raised by the worker thread when the server can't be reached or answers with an error"""
+
+
+class LeaderboardRejected(LeaderboardError):
+    """Raised when the server refuses a request for good, so retrying it won't help"""
+
+
+class LeaderboardClient:
+    """Submits finished runs to a leaderboard server without blocking the game loop.
+
+    Results are queued and sent in batches by a worker thread over one keep-alive connection.
+    The queue is saved to queue_file, so results which couldn't be sent are retried
+    after a restart. Failed requests are retried with exponential backoff.
+    Results the server rejects are moved out of the queue into a .rejected.json file next to it.
+    """
+
+    def __init__(self, url: str, queue_file: str) -> None:
+        parts = urlsplit(url)
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port
+        self._secure = parts.scheme == "https"
+        self._base_path = parts.path.rstrip("/")
+        self._connection: http.client.HTTPConnection | None = None
+
+        self._queue_file = Path(queue_file).expanduser()
+        self._rejected_file = self._queue_file.with_suffix(".rejected.json")
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: list[dict] = self._load_queue()
+        self._queue_changed = False
+        self._top_request: tuple[int, str] | None = None
+        self._retry_delay = 0.0
+        self._retry_at = 0.0
+
+        self.top_scores: list[dict] | None = None
+        self.sent = 0
+        self.failures = 0
+        self.rejected = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="leaderboard", daemon=True
+        )
+        self._thread.start()
+
+        # Results left over from the last run are sent right away
+        if self._pending:
+            self._wake.set()
+
+    def submit(self, name: str, score: int, difficulty: str) -> None:
+        """Queue a finished run to be sent"""
+        entry = {
+            "id": uuid.uuid4().hex,
+            "name": name,
+            "score": score,
+            "difficulty": difficulty,
+            "time": int(time.time()),
+        }
+
+        with self._lock:
+            self._pending.append(entry)
+            self._queue_changed = True
+
+        self._wake.set()
+
+    def request_top(self, limit: int, difficulty: str) -> None:
+        """Fetch the best scores in the background.
+        A LEADERBOARD_UPDATED event is posted once top_scores has been updated."""
+        with self._lock:
+            self._top_request = (limit, difficulty)
+
+        self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        """Amount of results which haven't been sent yet"""
+        with self._lock:
+            return len(self._pending)
+
+    def _load_queue(self) -> list[dict]:
+        """Load results which weren't sent before the last exit"""
+        try:
+            with open(self._queue_file, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return []
+
+    def _save_queue(self) -> None:
+        """Write the queue to disk, replacing the old file in one go"""
+        with self._lock:
+            if not self._queue_changed:
+                return
+            data = json.dumps(self._pending)
+            self._queue_changed = False
+
+        try:
+            self._queue_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self._queue_file.with_suffix(".tmp")
+            temp_file.write_text(data, encoding="utf-8")
+            os.replace(temp_file, self._queue_file)
+        except OSError as err:
+            print(f"Could not save leaderboard queue: {err}", file=sys.stderr)
+
+    def _request(self, method: str, path: str, body: dict | None = None) -> dict:
+        """Send a request over the kept-alive connection, reconnecting if needed"""
+        if self._connection is None:
+            connection_type = (
+                http.client.HTTPSConnection
+                if self._secure
+                else http.client.HTTPConnection
+            )
+            self._connection = connection_type(
+                self._host, self._port, timeout=LEADERBOARD_TIMEOUT
+            )
+
+        headers = {"Connection": "keep-alive"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+
+        try:
+            self._connection.request(method, self._base_path + path, payload, headers)
+            response = self._connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as err:
+            self._connection.close()
+            self._connection = None
+            raise LeaderboardError(err) from err
+
+        if 400 <= response.status < 500 and response.status not in RETRYABLE_STATUSES:
+            raise LeaderboardRejected(f"{method} {path}: HTTP {response.status}")
+        if response.status >= 400:
+            raise LeaderboardError(f"{method} {path}: HTTP {response.status}")
+
+        # E.g. the error page of a proxy
+        try:
+            result = json.loads(data or b"{}")
+        except ValueError as err:
+            raise LeaderboardError(f"{method} {path}: invalid response") from err
+
+        if not isinstance(result, dict):
+            raise LeaderboardError(f"{method} {path}: unexpected response")
+
+        return result
+
+    def _send_batches(self) -> None:
+        """Send all queued results, a batch at a time.
+        A rejected batch is sent again one result at a time, so only the bad ones are set aside.
+        """
+        while True:
+            with self._lock:
+                batch = self._pending[:LEADERBOARD_BATCH_SIZE]
+
+            if not batch:
+                return
+
+            try:
+                self._request("POST", "/scores", {"scores": batch})
+                self.sent += len(batch)
+            except LeaderboardRejected as err:
+                if len(batch) == 1:
+                    self._reject(batch, err)
+                else:
+                    for entry in batch:
+                        try:
+                            self._request("POST", "/scores", {"scores": [entry]})
+                            self.sent += 1
+                        except LeaderboardRejected as entry_err:
+                            self._reject([entry], entry_err)
+
+            sent_ids = {entry["id"] for entry in batch}
+            with self._lock:
+                self._pending = [e for e in self._pending if e["id"] not in sent_ids]
+                self._queue_changed = True
+
+            self._save_queue()
+
+    def _reject(self, entries: list[dict], err: LeaderboardRejected) -> None:
+        """Set aside results the server refused, so they don't block the queue"""
+        self.rejected += len(entries)
+        print(
+            f"Leaderboard rejected {len(entries)} result(s), moved to {self._rejected_file}: {err}",
+            file=sys.stderr,
+        )
+
+        try:
+            with open(self._rejected_file, encoding="utf-8") as file:
+                rejected = json.load(file)
+        except (OSError, ValueError):
+            rejected = []
+
+        try:
+            self._rejected_file.parent.mkdir(parents=True, exist_ok=True)
+            self._rejected_file.write_text(
+                json.dumps(rejected + entries), encoding="utf-8"
+            )
+        except OSError as save_err:
+            print(f"Could not save rejected results: {save_err}", file=sys.stderr)
+
+    def _fetch_top(self) -> None:
+        """Fetch the requested top scores"""
+        with self._lock:
+            request = self._top_request
+            self._top_request = None
+
+        if request is None:
+            return
+
+        limit, difficulty = request
+        query = urlencode({"limit": limit, "difficulty": difficulty})
+
+        try:
+            scores = self._request("GET", f"/scores?{query}").get("scores")
+            if not isinstance(scores, list):
+                raise LeaderboardError("GET /scores: no list of scores in the response")
+            self.top_scores = scores
+        except LeaderboardRejected as err:
+            # Asking again won't help
+            print(f"Leaderboard refused the top scores: {err}", file=sys.stderr)
+            return
+        except LeaderboardError:
+            # Ask again on the next attempt
+            with self._lock:
+                self._top_request = self._top_request or request
+            raise
+
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(LEADERBOARD_UPDATED))
+
+    def _run(self) -> None:
+        """Worker thread: waits for work, sends it and backs off on failures"""
+        while True:
+            timeout = None
+            if self._retry_at:
+                timeout = max(self._retry_at - time.monotonic(), 0)
+
+            self._wake.wait(timeout)
+            self._wake.clear()
+            self._save_queue()
+
+            # New work arriving while backing off waits for the retry as well
+            if time.monotonic() < self._retry_at:
+                continue
+
+            error = None
+
+            # New results are sent first, so the top list includes them.
+            # The top list is still fetched if they can't be sent.
+            for work in (self._send_batches, self._fetch_top):
+                try:
+                    work()
+                except LeaderboardError as err:
+                    error = error or err
+
+            if error:
+                self.failures += 1
+                self._retry_delay = min(
+                    max(self._retry_delay * 2, LEADERBOARD_RETRY_MIN),
+                    LEADERBOARD_RETRY_MAX,
+                )
+                self._retry_at = time.monotonic() + self._retry_delay
+                print(
+                    f"Leaderboard unavailable, retrying in {self._retry_delay:.0f}s: {error}",
+                    file=sys.stderr,
+                )
+            else:
+                self._retry_delay = 0.0
+                self._retry_at = 0.0
+
+
+_client: LeaderboardClient | None = None
+
+
+def get_client() -> LeaderboardClient | None:
+    """Get the shared leaderboard client.
+    Returns None if no LEADERBOARD_URL is set, or if threads aren't available (emscripten).
+    """
+    global _client
+
+    if _client is None and LEADERBOARD_URL and sys.platform != "emscripten":
+        _client = LeaderboardClient(LEADERBOARD_URL, LEADERBOARD_QUEUE_FILE)
+
+    return _client
@@ -0,0 +1,104 @@
+"""A local stand-in for the leaderboard server, for development and testing.
+
+Run it with: python -m src.leaderboard.server [--port 8765] [--delay 0]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class LeaderboardStore:
+    """Scores kept in memory. Entries are unique by id, so resent batches aren't counted twice."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._scores: dict[str, dict] = {}
+
+    def add(self, entries: list[dict]) -> int:
+        """Add entries, returns the amount of entries received"""
+        with self._lock:
+            for entry in entries:
+                self._scores[entry["id"]] = entry
+
+        return len(entries)
+
+    def top(self, limit: int, difficulty: str | None) -> list[dict]:
+        """The best scores, optionally only for one difficulty"""
+        with self._lock:
+            scores = [
+                s
+                for s in self._scores.values()
+                if difficulty is None or s["difficulty"] == difficulty
+            ]
+
+        scores.sort(key=lambda s: (-s["score"], s["time"]))
+        return scores[:limit]
+
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    """Handles POST /scores and GET /scores?limit=N&difficulty=name"""
+
+    protocol_version = "HTTP/1.1"
+    store = LeaderboardStore()
+    delay = 0.0
+
+    def _reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Send the top scores"""
+        url = urlsplit(self.path)
+        if url.path != "/scores":
+            self._reply(404, {"error": "not found"})
+            return
+
+        query = parse_qs(url.query)
+        limit = int(query.get("limit", ["10"])[0])
+        difficulty = query.get("difficulty", [None])[0]
+
+        time.sleep(self.delay)
+        self._reply(200, {"scores": self.store.top(limit, difficulty)})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Receive a batch of scores"""
+        if urlsplit(self.path).path != "/scores":
+            self._reply(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            entries = json.loads(self.rfile.read(length))["scores"]
+        except (ValueError, KeyError):
+            self._reply(400, {"error": "invalid body"})
+            return
+
+        time.sleep(self.delay)
+        self._reply(200, {"accepted": self.store.add(entries)})
+
+
+def serve(port: int = 8765, delay: float = 0.0) -> ThreadingHTTPServer:
+    """Create a server on localhost. Call serve_forever() on it to start serving.
+    delay makes every request take at least that many seconds, to simulate a slow server.
+    """
+    LeaderboardHandler.delay = delay
+    return ThreadingHTTPServer(("127.0.0.1", port), LeaderboardHandler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Traffic Evader leaderboard")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.delay)
+    print(f"Leaderboard listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,129 @@
+"""Cooperative background task scheduler"""
+
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from src.config import FPS
+
+
+class ScheduledTask:
+    """A unit of background work queued in a TaskScheduler.
+    Generators are resumed step by step, plain callables are run in one go.
+    A generator can yield a number of seconds to end its turn and sleep for that long
+    (0 means until the next frame)."""
+
+    def __init__(self, work: Iterator | Callable[[], object], name: str) -> None:
+        self.name = name
+        self.queued_at = time.perf_counter()
+        self.resume_at = 0.0
+        self.sleeping = False
+        self._work = work
+
+    def step(self) -> bool:
+        """Run one step of the task. Returns a bool indicating if the task finished."""
+        if callable(self._work):
+            self._work()
+            return True
+
+        try:
+            sleep = next(self._work)
+        except StopIteration:
+            return True
+
+        self.sleeping = sleep is not None
+        if self.sleeping:
+            self.resume_at = time.perf_counter() + sleep
+
+        return False
+
+
+class TaskScheduler:
+    """Runs background work in the slack time left at the end of each frame.
+
+    Generator tasks should yield often, as a step can't be interrupted.
+    No task runs for longer than task_budget seconds in a frame,
+    and nothing runs at all if the frame is already late."""
+
+    def __init__(self, frame_time: float = 1 / FPS, task_budget: float = 0.004) -> None:
+        self.frame_time = frame_time
+        self.task_budget = task_budget
+        self._tasks: deque[ScheduledTask] = deque()
+
+        self.completed = 0
+        self.deferred_frames = 0
+        self.busy_time = 0.0
+        self.overrun_time = 0.0
+        self.max_overrun = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def pending(self) -> int:
+        """Amount of queued tasks"""
+        return len(self._tasks)
+
+    def add(self, work: Iterator | Callable[[], object], name: str = "") -> None:
+        """Queue a generator or callable to be run in the background."""
+        self._tasks.append(ScheduledTask(work, name or repr(work)))
+
+    def cancel(self, name: str) -> None:
+        """Remove all queued tasks with the given name."""
+        self._tasks = deque(t for t in self._tasks if t.name != name)
+
+    def run(self, frame_start: float) -> None:
+        """Run queued tasks until the time left of the current frame is used up.
+        frame_start is the time.perf_counter() value from when the frame began."""
+        if not self._tasks:
+            return
+
+        deadline = frame_start + self.frame_time
+        started = time.perf_counter()
+
+        if started >= deadline:
+            self.deferred_frames += 1
+            return
+
+        # Each task gets one turn per frame, in round-robin order
+        for _ in range(len(self._tasks)):
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+
+            task = self._tasks.popleft()
+            if task.resume_at > now:
+                self._tasks.append(task)
+                continue
+
+            task_deadline = min(deadline, now + self.task_budget)
+            finished = False
+
+            while time.perf_counter() < task_deadline:
+                finished = task.step()
+                if finished or task.sleeping:
+                    break
+
+            if finished:
+                self.completed += 1
+                self.max_wait = max(self.max_wait, time.perf_counter() - task.queued_at)
+            else:
+                self._tasks.append(task)
+
+        ended = time.perf_counter()
+        self.busy_time += ended - started
+
+        # A step which runs past the deadline delays the next frame
+        if ended > deadline:
+            self.overrun_time += ended - deadline
+            self.max_overrun = max(self.max_overrun, ended - deadline)
+
+    def report(self) -> dict:
+        """Summary of queued work and how much it has delayed frames.
+        Times are in milliseconds."""
+        return {
+            "queued": [t.name for t in self._tasks],
+            "completed": self.completed,
+            "deferred_frames": self.deferred_frames,
+            "busy_ms": round(self.busy_time * 1000, 2),
+            "overrun_ms": round(self.overrun_time * 1000, 2),
+            "max_overrun_ms": round(self.max_overrun * 1000, 2),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
@@ -0,0 +1,276 @@
+"""Game state shared between a simulation process and a render process"""
+
+import struct
+import time
+from multiprocessing import shared_memory
+from multiprocessing.context import BaseContext
+from typing import NamedTuple
+from src.config import FPS, SPLIT_MAX_OBJECTS
+from src.snapshot import skin_index, skin_path
+
+# Input commands sent to the simulation
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+QUIT = 3
+
+# Index of the latest complete frame buffer, padded so the buffers start 8-byte aligned
+_LATEST = struct.Struct("<B7x")
+# tick, score, speed, exploding, finished, road y, side y, player x,
+# explosion x, explosion y, explosion sprite, coin sounds, explosion sounds,
+# amount of coins, amount of obstacles,
+# and for metrics: planned road objects, sync segments, rejected segments, collision checks
+_FRAME = struct.Struct("<IIH??hhhhhBIIHHHIII")
+# x, y, and the animation sprite of a coin or the skin of an obstacle
+_OBJECT = struct.Struct("<hhB")
+
+
+class Frame(NamedTuple):
+    """State of one simulated frame, as much as is needed to draw it"""
+
+    tick: int
+    score: int
+    speed: int
+    exploding: bool
+    finished: bool
+    road_y: int
+    side_y: int
+    player_x: int
+    explosion_center: tuple[int, int]
+    explosion_sprite: int
+    coin_sounds: int
+    explosion_sounds: int
+    coins: list[tuple[int, int, int]]
+    obstacles: list[tuple[int, int, str]]
+    planned: int
+    sync_segments: int
+    rejected: int
+    collision_checks: int
+
+
+class SharedGameState:
+    """A block of shared memory holding a double-buffered frame, and a pipe for input.
+
+    The simulation process writes each frame into the buffer which isn't the latest one,
+    and then marks it as the latest. The render process copies the latest buffer.
+    Each buffer has a lock, which also makes the writes of one process visible to the other
+    on CPUs which reorder memory accesses (e.g. ARM), not only on x86. As they are double
+    buffered, a side only ever waits for the other to finish copying one frame.
+    Input commands flow the other way through a pipe.
+
+    Created by the render process with a multiprocessing context, and passed to the
+    simulation process as an argument when starting it, which attaches it to the same memory.
+    """
+
+    def __init__(self, context: BaseContext) -> None:
+        self._set_layout()
+        self.owner = True
+        self.memory = shared_memory.SharedMemory(create=True, size=self._size)
+        self.name = self.memory.name
+        self._buf = self.memory.buf
+        self._buf[: self._size] = bytes(self._size)
+        self._last_tick = -1
+
+        self._locks = (context.Lock(), context.Lock())
+        self._input_reader, self._input_writer = context.Pipe(duplex=False)
+
+    def _set_layout(self) -> None:
+        """Work out the offsets of the parts of the shared memory"""
+        self._frame_size = _FRAME.size + 2 * SPLIT_MAX_OBJECTS * _OBJECT.size
+        # Rounded up, so the second buffer is 8-byte aligned as well
+        self._buffer_size = (self._frame_size + 7) // 8 * 8
+        self._buffers_offset = _LATEST.size
+        self._size = self._buffers_offset + 2 * self._buffer_size
+
+    def __getstate__(self) -> dict:
+        """What the simulation process needs, which attaches to the memory by its name"""
+        return {"name": self.name, "locks": self._locks, "input": self._input_reader}
+
+    def __setstate__(self, state: dict) -> None:
+        self._set_layout()
+        self.owner = False
+        self.memory = shared_memory.SharedMemory(state["name"])
+        self.name = self.memory.name
+        self._buf = self.memory.buf
+        self._last_tick = -1
+
+        self._locks = state["locks"]
+        self._input_reader = state["input"]
+        self._input_writer = None
+
+    def close(self) -> None:
+        """Detach from the shared memory, and free it if this side created it"""
+        self._buf.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+        self._input_reader.close()
+        if self._input_writer:
+            self._input_writer.close()
+
+    # Input, sent by the render process and received by the simulation
+
+    def push_input(self, command: int) -> None:
+        """Send an input command to the simulation"""
+        self._input_writer.send_bytes(bytes((command,)))
+
+    def pop_input(self) -> int | None:
+        """Take the oldest input command, or None if there is none.
+        Returns QUIT if the render process has gone away."""
+        try:
+            if not self._input_reader.poll():
+                return None
+            return self._input_reader.recv_bytes()[0]
+        except (EOFError, OSError):
+            return QUIT
+
+    # Frame buffers, written by the simulation and read by the render process
+
+    def _buffer_offset(self, index: int) -> int:
+        return self._buffers_offset + index * self._buffer_size
+
+    def publish(self, tick: int, session) -> None:
+        """Write the state of a GameSession as the latest frame"""
+        buf = self._buf
+        (latest,) = _LATEST.unpack_from(buf, 0)
+        index = 1 - latest
+
+        with self._locks[index]:
+            self._write_frame(self._buffer_offset(index), tick, session)
+
+        _LATEST.pack_into(buf, 0, index)
+
+    def _write_frame(self, position: int, tick: int, session) -> None:
+        """Pack the state of a GameSession at position"""
+        buf = self._buf
+        sprites = session.sprites
+        coins = sprites.coins[:SPLIT_MAX_OBJECTS]
+        obstacles = sprites.obstacles[:SPLIT_MAX_OBJECTS]
+        explosion = sprites.explosion
+
+        _FRAME.pack_into(
+            buf,
+            position,
+            tick,
+            session.score,
+            session.speed,
+            session.exploding,
+            session.finished,
+            sprites.background.rect.y,
+            sprites.background.bg_left_rect.y,
+            sprites.player.rect.x,
+            explosion.rect.centerx,
+            explosion.rect.centery,
+            explosion.frame,
+            session.coin_sounds,
+            session.explosion_sounds,
+            len(coins),
+            len(obstacles),
+            len(sprites.traffic.queue),
+            sprites.traffic.sync_segments,
+            sprites.traffic.rejected,
+            sprites.collision_checks,
+        )
+        position += _FRAME.size
+
+        for coin in coins:
+            _OBJECT.pack_into(
+                buf, position, coin.rect.x, coin.rect.y, coin.animation_frame[1]
+            )
+            position += _OBJECT.size
+
+        for obstacle in obstacles:
+            _OBJECT.pack_into(
+                buf,
+                position,
+                obstacle.rect.x,
+                obstacle.rect.y,
+                skin_index(obstacle.img_path),
+            )
+            position += _OBJECT.size
+
+    def read_frame(self) -> Frame | None:
+        """Get the latest complete frame, or None if there is no new one"""
+        (index,) = _LATEST.unpack_from(self._buf, 0)
+        offset = self._buffer_offset(index)
+
+        with self._locks[index]:
+            data = bytes(self._buf[offset : offset + self._frame_size])
+
+        values = _FRAME.unpack_from(data, 0)
+        tick = values[0]
+        # Tick 0 is the empty buffer before the first frame
+        if tick in (0, self._last_tick):
+            return None
+        self._last_tick = tick
+
+        coin_count, obstacle_count = values[13], values[14]
+        end = _FRAME.size + (coin_count + obstacle_count) * _OBJECT.size
+        objects = list(_OBJECT.iter_unpack(data[_FRAME.size : end]))
+        coins = objects[:coin_count]
+        obstacles = [
+            (pos_x, pos_y, skin_path(skin))
+            for pos_x, pos_y, skin in objects[coin_count : coin_count + obstacle_count]
+        ]
+
+        return Frame(
+            *values[:8],
+            (values[8], values[9]),
+            *values[10:13],
+            coins,
+            obstacles,  # type: ignore
+            *values[15:],
+        )
+
+
+def run_simulation(state: dict, shared: SharedGameState) -> None:
+    """Entry point of the simulation process.
+    Steps a GameSession at FPS and publishes every frame, until the game is over
+    or the render process asks it to quit. Spare time is used to plan the road ahead."""
+    # Imported here, so the render process can import this module without the views
+    from src.collision import collision_tables
+    from src.views.game import GameSession
+
+    session = GameSession(state)
+    session.resume_saved()
+    player = session.sprites.player
+    traffic = session.sprites.traffic.task()
+
+    # The first frame is shown while the collision tables are built,
+    # so none has to be built in the middle of a tick later
+    shared.publish(1, session)
+    for _ in collision_tables.task(player.img_path):
+        pass
+
+    tick = 1
+    frame_time = 1 / FPS
+    next_tick = time.perf_counter()
+
+    try:
+        while True:
+            while (command := shared.pop_input()) is not None:
+                if command == QUIT:
+                    session.save()
+                    return
+                if command == MOVE_LEFT:
+                    player.move_left()
+                elif command == MOVE_RIGHT:
+                    player.move_right()
+
+            session.step()
+            tick += 1
+            shared.publish(tick, session)
+
+            if session.finished:
+                return
+
+            next_tick += frame_time
+            # A late frame is simulated right away, but the clock isn't allowed to fall far behind
+            next_tick = max(next_tick, time.perf_counter() - frame_time)
+
+            while time.perf_counter() < next_tick - 0.002 and next(traffic) is None:
+                pass
+
+            time.sleep(max(next_tick - time.perf_counter(), 0))
+    finally:
+        shared.close()
@@ -0,0 +1,167 @@
+"""Compact binary snapshots of running games"""
+
+import os
+import struct
+from pathlib import Path
+from random import Random
+from src.config import CARS_OBSTACLES
+from src.utils import asset_path
+
+MAGIC = b"TESN"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sB")
+_LENGTH = struct.Struct("<B")
+_COUNT = struct.Struct("<H")
+# Mersenne Twister state: version, 624 words and the position in them, gauss_next
+_RANDOM = struct.Struct("<B625I?d")
+
+# Obstacle skins are stored as indices into the list of all obstacle cars
+OBSTACLE_SKINS = [
+    asset_path(f"sprites/obstacles/{car}")
+    for cars in CARS_OBSTACLES.values()
+    for car in cars
+]
+_SKIN_INDICES = {skin: index for index, skin in enumerate(OBSTACLE_SKINS)}
+NO_SKIN = 255
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is invalid or from another version of the game"""
+
+
+class SnapshotMismatch(SnapshotError):
+    """Raised when a snapshot is valid, but of a game with another difficulty or car"""
+
+
+def skin_index(skin: str | None) -> int:
+    """Index of an obstacle skin, to be stored in a snapshot"""
+    return NO_SKIN if skin is None else _SKIN_INDICES[skin]
+
+
+def skin_path(index: int) -> str | None:
+    """Obstacle skin from its index in a snapshot"""
+    if index == NO_SKIN:
+        return None
+
+    if index >= len(OBSTACLE_SKINS):
+        raise SnapshotError(f"Unknown obstacle skin {index}")
+
+    return OBSTACLE_SKINS[index]
+
+
+class SnapshotWriter:
+    """Packs values into a snapshot, one struct at a time"""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+
+    def write(self, fmt: struct.Struct, *values) -> None:
+        """Pack values with fmt"""
+        self._parts.append(fmt.pack(*values))
+
+    def write_count(self, count: int) -> None:
+        """Pack the length of a following list of records"""
+        self._parts.append(_COUNT.pack(count))
+
+    def write_string(self, value: str) -> None:
+        """Pack a short string"""
+        data = value.encode()
+        self._parts.append(_LENGTH.pack(len(data)) + data)
+
+    def write_random(self, rng: Random) -> None:
+        """Pack the state of a random number generator"""
+        version, words, gauss_next = rng.getstate()
+        self._parts.append(
+            _RANDOM.pack(version, *words, gauss_next is not None, gauss_next or 0.0)
+        )
+
+    def getvalue(self) -> bytes:
+        """The snapshot packed so far"""
+        return b"".join(self._parts)
+
+
+class SnapshotReader:
+    """Unpacks values from a snapshot in the order they were written"""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._offset = 0
+
+    def read(self, fmt: struct.Struct) -> tuple:
+        """Unpack the next values with fmt"""
+        try:
+            values = fmt.unpack_from(self._data, self._offset)
+        except struct.error as err:
+            raise SnapshotError("Snapshot is truncated") from err
+
+        self._offset += fmt.size
+        return values
+
+    def read_count(self) -> int:
+        """Unpack the length of a following list of records"""
+        return self.read(_COUNT)[0]
+
+    def read_string(self) -> str:
+        """Unpack a short string"""
+        (length,) = self.read(_LENGTH)
+        value = self._data[self._offset : self._offset + length]
+        if len(value) < length:
+            raise SnapshotError("Snapshot is truncated")
+
+        self._offset += length
+        try:
+            return value.decode()
+        except UnicodeDecodeError as err:
+            raise SnapshotError("Snapshot has an invalid string") from err
+
+    def read_random(self, rng: Random) -> None:
+        """Restore the state of a random number generator"""
+        version, *words, has_gauss, gauss_next = self.read(_RANDOM)
+        try:
+            rng.setstate((version, tuple(words), gauss_next if has_gauss else None))
+        except (TypeError, ValueError) as err:
+            raise SnapshotError("Snapshot has an invalid random state") from err
+
+
+def new_snapshot(difficulty: str, car: str) -> SnapshotWriter:
+    """Start a snapshot of a game played with difficulty and car"""
+    writer = SnapshotWriter()
+    writer.write(_HEADER, MAGIC, VERSION)
+    writer.write_string(difficulty)
+    writer.write_string(car)
+    return writer
+
+
+def open_snapshot(data: bytes) -> tuple[SnapshotReader, str, str]:
+    """Start reading a snapshot.
+    Returns the reader, and the difficulty and car the game was played with."""
+    reader = SnapshotReader(data)
+    magic, version = reader.read(_HEADER)
+
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError("Not a snapshot of this version of the game")
+
+    return reader, reader.read_string(), reader.read_string()
+
+
+def save_snapshot(file_path: str, data: bytes) -> None:
+    """Write a snapshot to a file, replacing the old one in one go"""
+    path = Path(file_path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(file_path: str) -> bytes | None:
+    """Read a saved snapshot. Returns None if there is no snapshot."""
+    try:
+        return Path(file_path).expanduser().read_bytes()
+    except OSError:
+        return None
+
+
+def delete_snapshot(file_path: str) -> None:
+    """Delete a saved snapshot once it has been resumed, so it's only resumed once"""
+    Path(file_path).expanduser().unlink(missing_ok=True)
@@ -1,10 +1,25 @@
 """Background sprite"""
 
+import struct
+from functools import cache
 import pygame
 from src.config import WIDTH, HEIGHT
+from src.display import load_image
+from src.snapshot import SnapshotReader, SnapshotWriter
 from src.utils import asset_path
 from .gameobject import GameObject
 
+# y of the road and of the sides
+_STATE = struct.Struct("<hh")
+
+
+@cache
+def _sides() -> tuple[pygame.Surface, pygame.Surface]:
+    """The left and right side of the road, shared by all backgrounds"""
+    raw_bg = load_image(asset_path("sprites/background.png"))
+    bg_left = pygame.transform.rotate(raw_bg, 90)
+    return bg_left, pygame.transform.flip(bg_left, True, False)
+
 
 class Background(GameObject):
     """Class managing game background"""
@@ -18,10 +33,8 @@ class Background(GameObject):
         self.rect.x = (WIDTH - self.rect.width) // 2
         self.rect.bottom = HEIGHT
 
-        # Load background and set up left and right side
-        raw_bg = pygame.image.load(asset_path("sprites/background.png")).convert_alpha()
-        self.bg_left = pygame.transform.rotate(raw_bg, 90)
-        self.bg_right = pygame.transform.flip(self.bg_left, True, False)
+        # Set up left and right side
+        self.bg_left, self.bg_right = _sides()
 
         self.bg_left_rect = self.bg_left.get_rect()
         self.bg_right_rect = self.bg_right.get_rect()
@@ -32,6 +45,11 @@ class Background(GameObject):
         self.bg_left_rect.bottom = HEIGHT
         self.bg_right_rect.bottom = HEIGHT
 
+        # Positions of the second copies, blitted above the first ones
+        self._rect_above = self.rect.move(0, -self.rect.height)
+        self._bg_left_above = self.bg_left_rect.move(0, -self.bg_left_rect.height)
+        self._bg_right_above = self.bg_right_rect.move(0, -self.bg_right_rect.height)
+
     def update(self, speed: int) -> None:
         """Move background for new frame"""
         # The road and background are blitted twice.
@@ -47,21 +65,38 @@ class Background(GameObject):
         self.bg_left_rect.y += speed
         self.bg_right_rect.y += speed
 
+        self._move_copies_above()
+
+    def _move_copies_above(self) -> None:
+        """Keep the second copies right above the first ones"""
+        self._rect_above.bottom = self.rect.top
+        self._bg_left_above.bottom = self.bg_left_rect.top
+        self._bg_right_above.bottom = self.bg_right_rect.top
+
+    def snapshot(self, writer: SnapshotWriter) -> None:
+        """Add the scroll position to a snapshot"""
+        writer.write(_STATE, self.rect.y, self.bg_left_rect.y)
+
+    def restore(self, reader: SnapshotReader) -> None:
+        """Restore the scroll position from a snapshot"""
+        self.scroll_to(*reader.read(_STATE))
+
+    def scroll_to(self, road_y: int, side_y: int) -> None:
+        """Move the road and the sides to the given y"""
+        self.rect.y = road_y
+        self.bg_left_rect.y = side_y
+        self.bg_right_rect.y = side_y
+        self._move_copies_above()
+
     def draw(self, dest_surface: pygame.Surface) -> None:
         # Blit road
         dest_surface.blit(self.image, self.rect)
-        dest_surface.blit(self.image, (self.rect.x, self.rect.y - self.rect.height))
-
-        bg_height = self.bg_left_rect.height
+        dest_surface.blit(self.image, self._rect_above)
 
         # Blit left background
         dest_surface.blit(self.bg_left, self.bg_left_rect)
-        dest_surface.blit(
-            self.bg_left, (self.bg_left_rect.x, self.bg_left_rect.y - bg_height)
-        )
+        dest_surface.blit(self.bg_left, self._bg_left_above)
 
         # Blit right background
         dest_surface.blit(self.bg_right, self.bg_right_rect)
-        dest_surface.blit(
-            self.bg_right, (self.bg_right_rect.x, self.bg_right_rect.y - bg_height)
-        )
+        dest_surface.blit(self.bg_right, self._bg_right_above)
@@ -1,10 +1,19 @@
 """Coin sprite"""
 
+from functools import cache
 import pygame
 from src.utils import asset_path
 from .gameobject import GameObject
 
 
+@cache
+def _first_frame(sheet_img: pygame.Surface) -> tuple[pygame.Surface, pygame.mask.Mask]:
+    """The first coin of the sprite sheet and its mask, shared by all coins"""
+    image = pygame.surface.Surface((32, 32), pygame.SRCALPHA)
+    image.blit(sheet_img, (0, 0), (0, 0, 32, 32))
+    return image, pygame.mask.from_surface(image)
+
+
 class Coin(GameObject):
     """Coin sprite class"""
 
@@ -19,18 +28,37 @@ class Coin(GameObject):
         self._current_sprite = 0
         self._sprites = 4
 
-        # Create a 32x32 surface and blit initial sprite onto it
-        self.image = pygame.surface.Surface((32, 32), pygame.SRCALPHA).convert_alpha()
+        # Use the initial sprite and its mask instead of the whole spritesheet
+        self.image, self.mask = _first_frame(self._sheet_img)
         self.rect = self.image.get_rect()
-        self.image.blit(self._sheet_img, (0, 0), self.rect)
 
-        # Overwrite mask to use correct surface instead of whole spritesheet
-        self.mask = pygame.mask.from_surface(self.image)
+        # The area of the sprite sheet which is currently shown
+        self._sheet_area = pygame.rect.Rect(0, 0, 32, 32)
 
         self.lane = lane
         self.rect.x = position[0]
         self.rect.y = position[1]
 
+    def reset(
+        self,
+        position: tuple[int, int],
+        lane: int,
+        animation_frame: tuple[int, int] = (0, 0),
+    ) -> None:
+        """Reuse this coin as a newly spawned one.
+        animation_frame can be given to continue an animation (see animation_frame)."""
+        self._frame_counter, self._current_sprite = animation_frame
+        self._sheet_area.x = self._current_sprite * 32
+
+        self.lane = lane
+        self.rect.x = position[0]
+        self.rect.y = position[1]
+
+    @property
+    def animation_frame(self) -> tuple[int, int]:
+        """Frames the current sprite has been shown for, and the current sprite"""
+        return self._frame_counter, self._current_sprite
+
     def update(self, speed: int) -> None:
         """Move sprite for new frame"""
         self._frame_counter += 1
@@ -41,12 +69,14 @@ class Coin(GameObject):
             else:
                 self._current_sprite += 1
 
-            self.image.fill((0, 0, 0, 0))
-            # Move the area (third argument) based on the next coin sprite to be shown
-            self.image.blit(
-                self._sheet_img, (0, 0), (self._current_sprite * 32, 0, 32, 32)
-            )
+            # Move the area based on the next coin sprite to be shown
+            self._sheet_area.x = self._current_sprite * 32
 
             self._frame_counter = 0
 
         self.rect.y += speed
+
+    def draw(self, dest_surface: pygame.Surface):
+        """Draw this sprite onto dest_surface.
+        The current frame is drawn straight from the sprite sheet."""
+        return dest_surface.blit(self._sheet_img, self.rect, self._sheet_area)
@@ -14,10 +14,13 @@ class Explosion(GameObject):
         self._sheet_img = self.image
         self._sheet_rect = self.rect
 
-        self.image = pygame.surface.Surface((80, 80), pygame.SRCALPHA).convert_alpha()
+        self.image = pygame.surface.Surface((80, 80), pygame.SRCALPHA)
         self.rect = self.image.get_rect()
         self.image.blit(self._sheet_img, (0, 0), self.rect)
 
+        # The area of the sprite sheet which is currently shown
+        self._sheet_area = pygame.rect.Rect(80, 0, 80, 80)
+
         self._frame_counter = 0
         self._sprite_frames = self._sheet_rect.width // self.rect.width
         self._current_sprite = 1
@@ -30,8 +33,22 @@ class Explosion(GameObject):
             self._frame_counter = 0
             self._current_sprite += 1
 
-        self.image.fill((0, 0, 0, 0))
-        self.image.blit(self._sheet_img, (0, 0), (self._current_sprite * 80, 0, 80, 80))
+        self._sheet_area.x = self._current_sprite * 80
 
         if self._current_sprite >= self._sprite_frames:
             self.animation_finished = True
+
+    @property
+    def frame(self) -> int:
+        """The sprite of the sheet which is currently shown"""
+        return self._current_sprite
+
+    def show_frame(self, frame: int) -> None:
+        """Show another sprite of the sheet, e.g. of an explosion animated elsewhere"""
+        self._current_sprite = frame
+        self._sheet_area.x = frame * 80
+
+    def draw(self, dest_surface: pygame.Surface):
+        """Draw this sprite onto dest_surface.
+        The current frame is drawn straight from the sprite sheet."""
+        return dest_surface.blit(self._sheet_img, self.rect, self._sheet_area)
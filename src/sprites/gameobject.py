@@ -1,6 +1,35 @@
 """A base game object class"""
 
+from pathlib import Path
 import pygame
+from src.diagnostics import memory
+from src.display import load_image
+
+# Loaded (and scaled) images and their masks, shared by all sprites using the same file
+_image_cache: dict[
+    tuple[str, float | tuple[int, int] | None],
+    tuple[pygame.Surface, pygame.mask.Mask],
+] = {}
+
+
+def load_sprite_image(
+    img_path: str, scale: float | tuple[int, int] | None = None
+) -> tuple[pygame.Surface, pygame.mask.Mask]:
+    """Load and scale a sprite image, and create its mask.
+    Each image is only loaded once, so the returned surface must not be changed."""
+    cached = _image_cache.get((img_path, scale))
+    if cached:
+        return cached
+
+    image = load_image(img_path)
+
+    if scale and isinstance(scale, float):
+        image = pygame.transform.scale_by(image, scale)
+    elif scale and isinstance(scale, tuple):
+        image = pygame.transform.scale(image, scale)
+
+    cached = _image_cache[(img_path, scale)] = (image, pygame.mask.from_surface(image))
+    return cached
 
 
 class GameObject(pygame.sprite.Sprite):
@@ -11,15 +40,10 @@ class GameObject(pygame.sprite.Sprite):
     ) -> None:
         super().__init__()
 
-        self.image = pygame.image.load(img_path).convert_alpha()
-
-        if scale and isinstance(scale, float):
-            self.image = pygame.transform.scale_by(self.image, scale)
-        elif scale and isinstance(scale, tuple):
-            self.image = pygame.transform.scale(self.image, scale)
-
+        self.image, self.mask = load_sprite_image(img_path, scale)
         self.rect = self.image.get_rect()
-        self.mask = pygame.mask.from_surface(self.image)
+
+        memory.track(self, Path(img_path).name)
 
     def draw(self, dest_surface: pygame.Surface):
         """Draw this sprite onto dest_surface."""
@@ -1,34 +1,50 @@
 """Obstacle sprite"""
 
-from random import randint, choice
+import random
 from src.config import CARS_OBSTACLES
 from src.utils import asset_path
-from .gameobject import GameObject
+from .gameobject import GameObject, load_sprite_image
 
 
 class Obstacle(GameObject):
     """Obstacle sprite class"""
 
-    def __init__(self, position: tuple[int, int], lane: int) -> None:
-        self.img_path = self._select_random_car()
+    def __init__(
+        self, position: tuple[int, int], lane: int, img_path: str | None = None
+    ) -> None:
+        self.img_path = img_path or self.select_random_car()
         super().__init__(self.img_path, (64, 64))
 
         self.rect.x = position[0]
         self.rect.y = position[1]
         self.lane = lane
 
-    def _select_random_car(self) -> str:
+    def reset(self, position: tuple[int, int], lane: int, img_path: str) -> None:
+        """Reuse this obstacle as a newly spawned one, possibly with another car"""
+        if img_path != self.img_path:
+            self.img_path = img_path
+            self.image, self.mask = load_sprite_image(img_path, (64, 64))
+
+        self.rect.x = position[0]
+        self.rect.y = position[1]
+        self.lane = lane
+
+    @staticmethod
+    def select_random_car(rng: random.Random | None = None) -> str:
         """Select a random car from the low, medium or high class.
         Low-end cars have a 60% change of being chosen, mediums have 37% and highs have 3%.
+        rng can be given to use another random number generator than the global one.
         """
-        rand = randint(1, 100)
+        # The random module has the same functions as a Random instance
+        rng = rng or random  # type: ignore
+        rand = rng.randint(1, 100)
 
         if rand <= 60:
-            chosen_car = choice(CARS_OBSTACLES["low"])
+            chosen_car = rng.choice(CARS_OBSTACLES["low"])
         elif rand <= 97:
-            chosen_car = choice(CARS_OBSTACLES["medium"])
+            chosen_car = rng.choice(CARS_OBSTACLES["medium"])
         else:
-            chosen_car = choice(CARS_OBSTACLES["high"])
+            chosen_car = rng.choice(CARS_OBSTACLES["high"])
 
         return asset_path(f"sprites/obstacles/{chosen_car}")
 
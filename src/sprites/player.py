@@ -1,15 +1,22 @@
 """Player sprite"""
 
+import struct
 from typing import Literal
 from src.config import LANE_SWITCH_SPEED
+from src.snapshot import SnapshotReader, SnapshotWriter
 from .gameobject import GameObject
 
+SWITCHING_STATES: tuple[Literal["left", "right", False], ...] = (False, "left", "right")
+# lane, switching_lane, x, moving_to
+_STATE = struct.Struct("<BBhh")
+
 
 class Player(GameObject):
     """Class managing the player"""
 
     def __init__(self, img_path: str, level: dict) -> None:
         super().__init__(img_path, (75, 75))
+        self.img_path = img_path
 
         self.level_info = level
 
@@ -55,3 +62,18 @@ class Player(GameObject):
             else:
                 self.rect.centerx = self._moving_to
                 self.switching_lane = False
+
+    def snapshot(self, writer: SnapshotWriter) -> None:
+        """Add the position and lane switch state to a snapshot"""
+        writer.write(
+            _STATE,
+            self.lane,
+            SWITCHING_STATES.index(self.switching_lane),
+            self.rect.x,
+            self._moving_to,
+        )
+
+    def restore(self, reader: SnapshotReader) -> None:
+        """Restore the position and lane switch state from a snapshot"""
+        self.lane, switching, self.rect.x, self._moving_to = reader.read(_STATE)
+        self.switching_lane = SWITCHING_STATES[switching]
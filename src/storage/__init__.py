@@ -1,2 +1,2 @@
 from .font import Fonts
-from .sound import Sounds
+from .sound import SoundBank, sounds
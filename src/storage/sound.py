@@ -1,31 +1,112 @@
 """Sound manager"""
 
-from sys import platform as sys_platform
+import sys
+import time
 import pygame
+from src.config import (
+    MIXER_FREQUENCY,
+    MIXER_BUFFER,
+    SOUND_CHANNELS,
+    SOUND_MERGE_WINDOW,
+)
+from src.diagnostics import memory
 from src.utils import asset_path
 
+# name: (file name without extension, volume, category)
+SOUNDS = {
+    "coin": ("coin", 0.3, "pickup"),
+    "explosion": ("explosion", 0.3, "effect"),
+    "click": ("menu_click", 0.5, "ui"),
+    "click_deny": ("menu_deny", 0.5, "ui"),
+}
 
-class Sounds:
-    """Class storing game sounds"""
+
+class SoundBank:
+    """Game sounds, shared by all views and UI elements.
+
+    The mixer is only initialized when the first sound is needed, and each sound is
+    decoded once into the mixer's format. Every category plays on its own reserved
+    channels, which cap how many of its sounds can be heard at once: when all of them
+    are busy, the sound which has played the longest is cut off. Triggering a sound
+    again within SOUND_MERGE_WINDOW seconds is merged into the one already playing.
+    """
 
     def __init__(self) -> None:
-        if sys_platform == "emscripten":
-            self.file_extension = "ogg"
-        else:
-            self.file_extension = "wav"
-
-        self.coin = pygame.mixer.Sound(asset_path(f"sounds/coin.{self.file_extension}"))
-        self.explosion = pygame.mixer.Sound(
-            asset_path(f"sounds/explosion.{self.file_extension}")
-        )
-        self.click = pygame.mixer.Sound(
-            asset_path(f"sounds/menu_click.{self.file_extension}")
-        )
-        self.click_deny = pygame.mixer.Sound(
-            asset_path(f"sounds/menu_deny.{self.file_extension}")
-        )
-
-        self.coin.set_volume(0.3)
-        self.explosion.set_volume(0.3)
-        self.click.set_volume(0.5)
-        self.click_deny.set_volume(0.5)
+        self.file_extension = "ogg" if sys.platform == "emscripten" else "wav"
+
+        self._sounds: dict[str, pygame.mixer.Sound] = {}
+        self._channels: dict[str, list[pygame.mixer.Channel]] = {}
+        # When each channel of a category last started playing
+        self._started: dict[str, list[float]] = {}
+        self._last_played: dict[str, float] = {}
+        self._available: bool | None = None
+
+        self.played = 0
+        self.merged = 0
+        self.cut_off = 0
+
+        memory.track(self, "sounds")
+
+    def preload(self) -> bool:
+        """Initialize the mixer and decode all sounds, if that hasn't been done yet.
+        Returns a bool indicating if sounds can be played."""
+        if self._available is not None:
+            return self._available
+
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(MIXER_FREQUENCY, -16, 2, MIXER_BUFFER)
+        except pygame.error as err:
+            print(f"Sound unavailable: {err}", file=sys.stderr)
+            self._available = False
+            return False
+
+        # Reserved channels are never picked by Sound.play(), so categories can't steal each other's
+        total_channels = sum(SOUND_CHANNELS.values())
+        pygame.mixer.set_num_channels(total_channels)
+        pygame.mixer.set_reserved(total_channels)
+
+        first_channel = 0
+        for category, amount in SOUND_CHANNELS.items():
+            self._channels[category] = [
+                pygame.mixer.Channel(first_channel + i) for i in range(amount)
+            ]
+            self._started[category] = [0.0] * amount
+            first_channel += amount
+
+        for name, (file_name, volume, _) in SOUNDS.items():
+            sound = pygame.mixer.Sound(
+                asset_path(f"sounds/{file_name}.{self.file_extension}")
+            )
+            sound.set_volume(volume)
+            self._sounds[name] = sound
+
+        self._available = True
+        return True
+
+    def play(self, name: str) -> None:
+        """Play a sound on its category's channels"""
+        now = time.monotonic()
+        if now - self._last_played.get(name, -SOUND_MERGE_WINDOW) < SOUND_MERGE_WINDOW:
+            self.merged += 1
+            return
+        self._last_played[name] = now
+
+        if not self.preload():
+            return
+
+        category = SOUNDS[name][2]
+        channels = self._channels[category]
+        started = self._started[category]
+        index = next((i for i, c in enumerate(channels) if not c.get_busy()), None)
+
+        if index is None:
+            index = started.index(min(started))
+            self.cut_off += 1
+
+        channels[index].play(self._sounds[name])
+        started[index] = now
+        self.played += 1
+
+
+sounds = SoundBank()
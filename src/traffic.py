@@ -0,0 +1,402 @@
+"""Look-ahead traffic generator"""
+
+import heapq
+import math
+import struct
+from collections import deque
+from random import Random
+from typing import Literal, NamedTuple
+from src.config import (
+    LANE_SWITCH_SPEED,
+    TRAFFIC_LOOKAHEAD,
+    TRAFFIC_SEGMENT,
+    TRAFFIC_PATTERN_CHANCE,
+    SPAWN_DISTANCE,
+)
+from src.snapshot import SnapshotReader, SnapshotWriter, skin_index, skin_path
+from src.sprites import Obstacle
+
+OBJECT_HEIGHTS = {"coin": 32, "obstacle": 64}
+OBSTACLE_WIDTH = 64
+# Minimum free road between two objects in the same lane
+LANE_GAP = 20
+PLAYER_SIZE = 75
+# Road distance resolution of the passability check
+CELL = 8
+# Cells of the passability check kept from before its checkpoint, enough for a lane switch
+# at any speed the game reaches
+HISTORY = 128
+
+# Designed patterns: (kind, lane offset, distance offset) for each object
+PATTERNS: dict[str, list[tuple[Literal["obstacle", "coin"], int, int]]] = {
+    "coin_trail": [("coin", 0, i * 56) for i in range(5)],
+    "coin_stairs": [("coin", i, i * 64) for i in range(3)],
+    "guarded_coins": [("obstacle", 0, 0), ("coin", 1, 16), ("coin", 1, 72)],
+}
+KINDS: tuple[Literal["obstacle", "coin"], ...] = ("coin", "obstacle")
+
+# planned_until, speed, sync_segments, rejected
+_STATE = struct.Struct("<iHII")
+# distance, kind, lane, skin
+_PLANNED = struct.Struct("<iBBB")
+# lane, start, end
+_RECENT = struct.Struct("<Bii")
+# checkpoint cell
+_CHECKPOINT = struct.Struct("<i")
+_HISTORY = struct.Struct(f"<{HISTORY}B")
+
+
+class PlannedObject(NamedTuple):
+    """A road object which is yet to be spawned.
+    distance is how far the road has to have moved for the object's top to reach the top of the screen.
+    """
+
+    distance: int
+    kind: Literal["obstacle", "coin"]
+    lane: int
+    skin: str | None
+
+
+class TrafficGenerator:
+    """Plans coins and obstacles several screens ahead of the player.
+
+    The road is planned in segments, each of them checked for overlapping objects.
+    Obstacles are only placed if the player can still get past all of them, see _passable_with().
+    Segments can be generated in the background with task(),
+    the GameSpriteManager only consumes the queue with pop_due().
+    """
+
+    def __init__(self, level: dict, rng: Random) -> None:
+        self.lanes: int = level["lanes"]
+        self.rng = rng
+        # A heap, as patterns can reach into the next segment
+        self.queue: list[PlannedObject] = []
+        self.speed = 1
+
+        # Distance the player has travelled, updated by the consumer
+        self.distance = 0
+        # Nothing is planned in the first few pixels, so objects never appear on screen out of nowhere
+        self.planned_until = OBJECT_HEIGHTS["obstacle"]
+
+        self._lane_free_at = [0] * (self.lanes + 1)
+        self._lane_free_at_format = struct.Struct(f"<{self.lanes + 1}i")
+        # (lane, first cell, last cell) the player can't be in because of obstacles
+        # planned after the checkpoint
+        self._recent_obstacles: deque[tuple[int, int, int]] = deque()
+
+        # Passability up to the checkpoint cell, which no obstacle planned later can reach back to.
+        # Lanes are bit masks. For each of the last HISTORY cells: lanes the player can be in,
+        # and lanes the player can have left by then. The free cells in a row each lane ended with.
+        self._lane_width = level["lane_width"]
+        self._all_lanes = (1 << (self.lanes + 1)) - 2
+        # The player starts before the first obstacle can reach it, in the starting lane
+        self._checkpoint = -PLAYER_SIZE // CELL - 1
+        self._reachable = [1 << level["player"]["init_lane"]] * HISTORY
+        self._departed = [0] * HISTORY
+        self._free_run = [HISTORY] * (self.lanes + 1)
+        self._free_run_format = struct.Struct(f"<{self.lanes + 1}i")
+
+        self.sync_segments = 0
+        self.rejected = 0
+
+    def _lane_free(self, lane: int, distance: int) -> bool:
+        """Check if an object can be planned in lane at distance without overlapping another one."""
+        return 1 <= lane <= self.lanes and distance >= self._lane_free_at[lane]
+
+    def _blocked_cells(self, lane: int, distance: int) -> tuple[int, int, int]:
+        """(lane, first cell, last cell) the player can't be in because of an obstacle.
+        Cells are road distances at which the player's top would be at the obstacle's top.
+        Two frames of movement are added on each side, as the player only reacts once per frame,
+        and collisions are swept over a frame's movement."""
+        margin = 2 * (self.speed + 1)
+        return (
+            lane,
+            (distance - PLAYER_SIZE - margin) // CELL,
+            (distance + OBJECT_HEIGHTS["obstacle"] + margin) // CELL,
+        )
+
+    def _switch_cells(self) -> tuple[int, int, int]:
+        """Cells a lane switch takes to leave the old lane, to reach the new lane, and in total.
+        Assumes a speed one higher than the current one, in case it rises before the road is reached.
+        """
+        frames = round(15 / LANE_SWITCH_SPEED)
+        delta_x = round(self._lane_width / frames)
+        # Horizontal distance between the centers of the player and an obstacle at which they touch
+        touching = (PLAYER_SIZE + OBSTACLE_WIDTH) / 2
+
+        leave = min(math.ceil(touching / delta_x), frames)
+        reach = max(math.floor((self._lane_width - touching) / delta_x), 0)
+        speed = self.speed + 1
+
+        return (
+            math.ceil(leave * speed / CELL),
+            math.floor(reach * speed / CELL),
+            math.ceil(frames * speed / CELL),
+        )
+
+    def _simulate(
+        self, obstacles: list[tuple[int, int, int]], until: int
+    ) -> tuple[list[int], list[int], list[int]]:
+        """Work out which lanes the player can be in from the checkpoint up to the cell until.
+        Returns the reachable and departed lanes of every cell from HISTORY cells before the
+        checkpoint on, and the free runs of the lanes at until."""
+        leave, reach, total = self._switch_cells()
+        first = self._checkpoint + 1
+
+        blocked = [0] * (until - first + 1)
+        for lane, start, end in obstacles:
+            for cell in range(max(start, first), min(end, until) + 1):
+                blocked[cell - first] |= 1 << lane
+
+        reachable = self._reachable.copy()
+        departed = self._departed.copy()
+        free_run = self._free_run.copy()
+        lanes = range(1, self.lanes + 1)
+
+        for blocked_lanes in blocked:
+            left_long_enough = 0
+            arrived_long_enough = 0
+            for lane in lanes:
+                if blocked_lanes >> lane & 1:
+                    free_run[lane] = 0
+                else:
+                    free_run[lane] += 1
+                    if free_run[lane] >= leave:
+                        left_long_enough |= 1 << lane
+                    if free_run[lane] > total - reach:
+                        arrived_long_enough |= 1 << lane
+
+            # Lanes the player stays in, and the ones they were in when starting a switch
+            # which is far enough along to not touch that lane's obstacles anymore
+            now = reachable[-1] & ~blocked_lanes
+            departed.append(reachable[-leave] & left_long_enough)
+
+            # Switches which have ended, without touching obstacles of the new lane on the way
+            switched = departed[-1 - total + leave]
+            now |= (
+                (switched << 1 | switched >> 1) & arrived_long_enough & self._all_lanes
+            )
+
+            reachable.append(now)
+
+        return reachable, departed, free_run
+
+    def _passable_with(self, lane: int, distance: int) -> bool:
+        """Check if the player can still get past every planned obstacle with a new one.
+        Lane switches are simulated cell by cell from the checkpoint on, so obstacles far apart
+        which together need several switches in too little road are found as well."""
+        obstacles = [*self._recent_obstacles, self._blocked_cells(lane, distance)]
+        until = max(end for _, _, end in obstacles) + self._switch_cells()[2] + 1
+
+        reachable, _, _ = self._simulate(obstacles, until)
+        return reachable[-1] != 0
+
+    def _move_checkpoint(self, distance: int) -> None:
+        """Move the checkpoint up to where obstacles planned from distance on can reach back to"""
+        # Also leaves room for the speed to rise before then
+        checkpoint = (distance - PLAYER_SIZE - 2 * (self.speed + 3)) // CELL - 1
+        if checkpoint <= self._checkpoint:
+            return
+
+        reachable, departed, self._free_run = self._simulate(
+            list(self._recent_obstacles), checkpoint
+        )
+        self._reachable = reachable[-HISTORY:]
+        self._departed = departed[-HISTORY:]
+        self._checkpoint = checkpoint
+
+        # Obstacles before the checkpoint are part of its state now
+        while self._recent_obstacles and self._recent_obstacles[0][2] <= checkpoint:
+            self._recent_obstacles.popleft()
+
+    def _place(self, planned: PlannedObject, plan: list[PlannedObject]) -> None:
+        """Reserve road for an object and add it to the plan of the current segment."""
+        end = planned.distance + OBJECT_HEIGHTS[planned.kind]
+        self._lane_free_at[planned.lane] = end + LANE_GAP
+
+        if planned.kind == "obstacle":
+            self._recent_obstacles.append(
+                self._blocked_cells(planned.lane, planned.distance)
+            )
+
+        plan.append(planned)
+
+    def _try_object(
+        self,
+        kind: Literal["obstacle", "coin"],
+        distance: int,
+        plan: list[PlannedObject],
+    ) -> bool:
+        """Try placing one random object at distance. Returns a bool indicating if it was placed."""
+        lanes = [
+            lane for lane in range(1, self.lanes + 1) if self._lane_free(lane, distance)
+        ]
+        if kind == "obstacle":
+            lanes = [lane for lane in lanes if self._passable_with(lane, distance)]
+
+        if not lanes:
+            self.rejected += 1
+            return False
+
+        skin = Obstacle.select_random_car(self.rng) if kind == "obstacle" else None
+        self._place(PlannedObject(distance, kind, self.rng.choice(lanes), skin), plan)
+        return True
+
+    def _try_pattern(self, name: str, distance: int, plan: list[PlannedObject]) -> bool:
+        """Try placing a designed pattern at distance, in any lane it fits in.
+        Returns a bool indicating if it was placed."""
+        pattern = PATTERNS[name]
+        first_lanes = list(range(1, self.lanes + 1))
+        self.rng.shuffle(first_lanes)
+
+        for first_lane in first_lanes:
+            # Patterns have to fit as a whole, checked against the road planned before them
+            fits = all(
+                self._lane_free(first_lane + lane_offset, distance + offset)
+                and (
+                    kind != "obstacle"
+                    or self._passable_with(first_lane + lane_offset, distance + offset)
+                )
+                for kind, lane_offset, offset in pattern
+            )
+
+            if fits:
+                for kind, lane_offset, offset in pattern:
+                    skin = (
+                        Obstacle.select_random_car(self.rng)
+                        if kind == "obstacle"
+                        else None
+                    )
+                    self._place(
+                        PlannedObject(
+                            distance + offset, kind, first_lane + lane_offset, skin
+                        ),
+                        plan,
+                    )
+                return True
+
+        self.rejected += 1
+        return False
+
+    def _amount(self, per_screen: float) -> int:
+        """Randomly round the expected amount of objects in a segment"""
+        expected = per_screen * TRAFFIC_SEGMENT / 1000
+        return int(expected) + (self.rng.random() < expected % 1)
+
+    def generate_segment(self) -> None:
+        """Plan the next segment of road.
+        Object density follows the current speed, like objects spawned on demand used to.
+        """
+        start = self.planned_until
+        end = start + TRAFFIC_SEGMENT
+
+        placements: list[tuple[int, str]] = []
+        placements += [
+            (self.rng.randrange(start, end), "coin")
+            for _ in range(self._amount(self.speed))
+        ]
+        placements += [
+            (self.rng.randrange(start, end), "obstacle")
+            for _ in range(self._amount(self.speed // 2))
+        ]
+        if self.rng.random() < TRAFFIC_PATTERN_CHANCE:
+            placements.append(
+                (self.rng.randrange(start, end), self.rng.choice(list(PATTERNS)))
+            )
+
+        # Objects are placed in road order, so each lane only has to remember where it's free again
+        placements.sort()
+        plan: list[PlannedObject] = []
+
+        for distance, what in placements:
+            if what in PATTERNS:
+                self._try_pattern(what, distance, plan)
+            else:
+                self._try_object(what, distance, plan)  # type: ignore
+
+        for planned in plan:
+            heapq.heappush(self.queue, planned)
+        self.planned_until = end
+
+        self._move_checkpoint(end)
+
+    def needs_segments(self) -> bool:
+        """Check if less than TRAFFIC_LOOKAHEAD of road is planned ahead"""
+        return self.planned_until < self.distance + SPAWN_DISTANCE + TRAFFIC_LOOKAHEAD
+
+    def task(self):
+        """Background task planning the road ahead, one segment per step.
+        Queue it in the view scheduler, and cancel it when the game ends."""
+        while True:
+            if self.needs_segments():
+                self.generate_segment()
+                yield
+            else:
+                yield 0
+
+    def snapshot(self, writer: SnapshotWriter) -> None:
+        """Add the planned road to a snapshot.
+        The random number generator is shared with the consumer, which snapshots it."""
+        writer.write(
+            _STATE, self.planned_until, self.speed, self.sync_segments, self.rejected
+        )
+        writer.write(self._lane_free_at_format, *self._lane_free_at)
+
+        writer.write_count(len(self._recent_obstacles))
+        for recent in self._recent_obstacles:
+            writer.write(_RECENT, *recent)
+
+        writer.write(_CHECKPOINT, self._checkpoint)
+        writer.write(_HISTORY, *self._reachable)
+        writer.write(_HISTORY, *self._departed)
+        writer.write(self._free_run_format, *self._free_run)
+
+        # The heap is stored as it is, so it doesn't have to be rebuilt
+        writer.write_count(len(self.queue))
+        for planned in self.queue:
+            writer.write(
+                _PLANNED,
+                planned.distance,
+                KINDS.index(planned.kind),
+                planned.lane,
+                skin_index(planned.skin),
+            )
+
+    def restore(self, reader: SnapshotReader, distance: int) -> None:
+        """Restore the planned road from a snapshot"""
+        self.distance = distance
+        self.planned_until, self.speed, self.sync_segments, self.rejected = reader.read(
+            _STATE
+        )
+        self._lane_free_at = list(reader.read(self._lane_free_at_format))
+
+        self._recent_obstacles.clear()
+        for _ in range(reader.read_count()):
+            self._recent_obstacles.append(reader.read(_RECENT))
+
+        (self._checkpoint,) = reader.read(_CHECKPOINT)
+        self._reachable = list(reader.read(_HISTORY))
+        self._departed = list(reader.read(_HISTORY))
+        self._free_run = list(reader.read(self._free_run_format))
+
+        self.queue = []
+        for _ in range(reader.read_count()):
+            planned_distance, kind, lane, skin = reader.read(_PLANNED)
+            self.queue.append(
+                PlannedObject(planned_distance, KINDS[kind], lane, skin_path(skin))
+            )
+
+    def pop_due(self, distance: int) -> PlannedObject | None:
+        """Get the next planned object which should be spawned after the road has moved distance.
+        Call it until it returns None to get all of them.
+        If the background task fell behind, the missing road is planned right away."""
+        self.distance = distance
+
+        while self.planned_until < distance + SPAWN_DISTANCE + TRAFFIC_SEGMENT:
+            self.sync_segments += 1
+            self.generate_segment()
+
+        if self.queue and self.queue[0].distance <= distance + SPAWN_DISTANCE:
+            return heapq.heappop(self.queue)
+
+        return None
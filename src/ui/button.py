@@ -2,7 +2,8 @@
 
 from typing import Optional
 import pygame
-from src.storage import Fonts, Sounds
+from src.diagnostics import memory
+from src.storage import Fonts, sounds
 
 
 class Button:
@@ -19,23 +20,26 @@ class Button:
         self.clicked = False
         self.text = text
         self.fonts = Fonts()
-        self.sounds = Sounds()
 
-    def click_event(self):
-        """Handles a click event in game loop iteration.
-        Call whenever a click event happens."""
-        mouse_position = pygame.mouse.get_pos()
+        # The text never changes, so it's only rendered once
+        self.text_img = None
+        if self.text:
+            self.text_img = self.fonts.font_button.render(self.text, True, "black")
+            self.text_rect = self.text_img.get_rect(center=self.rect.center)
+
+        memory.track(self, self.text or "")
 
-        if self.rect.collidepoint(mouse_position):
+    def click_event(self, position: tuple[int, int]):
+        """Handles a click event in game loop iteration.
+        Call whenever a click event happens, with the event's position.
+        Event positions are in screen coordinates even when the window is scaled."""
+        if self.rect.collidepoint(position):
             self.clicked = True
-            self.sounds.click.play()
+            sounds.play("click")
 
     def draw(self, dest_surface: pygame.Surface):
         """Draw this button onto dest_surface."""
-        pygame.draw.rect(dest_surface, self.color, self.rect)
+        dest_surface.fill(self.color, self.rect)
 
-        if self.text:
-            rendered_text = self.fonts.font_button.render(self.text, True, "black")
-            dest_surface.blit(
-                rendered_text, rendered_text.get_rect(center=self.rect.center)
-            )
+        if self.text_img:
+            dest_surface.blit(self.text_img, self.text_rect)
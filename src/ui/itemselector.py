@@ -1,7 +1,8 @@
 """UI item selector"""
 
 import pygame
-from src.storage import Sounds
+from src.diagnostics import memory
+from src.storage import sounds
 from .selectableitem import SelectableItem
 
 
@@ -22,19 +23,19 @@ class ItemSelector:
         self.items_width = self.rows[0][0].rect.width
         self.items_height = self.rows[0][0].rect.height
 
-        self.image = pygame.surface.Surface(
-            (
-                self.items_width * len(self.rows[0]) + (len(self.rows[0]) - 1) * 50,
-                self.items_height * len(self.rows) + (len(self.rows) - 1) * 25,
-            ),
-            pygame.SRCALPHA,
+        self.size = (
+            self.items_width * len(self.rows[0]) + (len(self.rows[0]) - 1) * 50,
+            self.items_height * len(self.rows) + (len(self.rows) - 1) * 25,
         )
+        self.image = pygame.surface.Surface(self.size, pygame.SRCALPHA)
         self.rect = self.image.get_rect()
 
         self.active_item = self.rows[init_active[0]][init_active[1]]
-        self.sounds = Sounds()
 
         self._set_item_positions()
+        self._compose()
+
+        memory.track(self)
 
     def _set_item_positions(self) -> None:
         """Sets up item positions in the grid."""
@@ -57,10 +58,21 @@ class ItemSelector:
 
         raise RuntimeError("Index of active item in ItemSelector could not be found")
 
-    def process_input(self, position: tuple[int, int]) -> None:
-        """Handle a click event for an ItemSelector."""
+    def _compose(self) -> None:
+        """Draw all items onto the ItemSelector surface.
+        Only needed when the active item changes.
+        A new surface is used, as the old one may already be uploaded as a texture."""
+        self.image = pygame.surface.Surface(self.size, pygame.SRCALPHA)
+
+        for row in self.rows:
+            for item in row:
+                item.draw(self.image, item == self.active_item)
+
+    def process_input(self, position: tuple[int, int]) -> bool:
+        """Handle a click event for an ItemSelector.
+        Returns a bool indicating if the active item changed."""
         if not self.rect.collidepoint(position):
-            return
+            return False
 
         # Find relative coordinates where the user clicked inside the ItemSelector surface
         relative_x = position[0] - self.rect.x
@@ -70,19 +82,16 @@ class ItemSelector:
             for item in row:
                 if item.rect.collidepoint(relative_x, relative_y):
                     if self.active_item == item:
-                        self.sounds.click_deny.play()
-                    else:
-                        self.active_item = item
-                        self.sounds.click.play()
-                    break
+                        sounds.play("click_deny")
+                        return False
 
-    def draw(self, dest_surface: pygame.Surface) -> None:
-        """Draw this ItemSelector onto dest_surface."""
-        self.image.fill((0, 0, 0, 0))
-        self.active_item.draw(self.image, True)
+                    self.active_item = item
+                    sounds.play("click")
+                    self._compose()
+                    return True
 
-        for row in self.rows:
-            for item in row:
-                item.draw(self.image)
+        return False
 
+    def draw(self, dest_surface: pygame.Surface) -> None:
+        """Draw this ItemSelector onto dest_surface."""
         dest_surface.blit(self.image, self.rect)
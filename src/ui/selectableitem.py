@@ -2,6 +2,8 @@
 
 from typing import Optional
 import pygame
+from src.diagnostics import memory
+from src.display import load_image
 from src.storage import Fonts
 
 
@@ -21,7 +23,7 @@ class SelectableItem:
         self.rect = self.image.get_rect()
 
         if img_path:
-            self.item_img = pygame.image.load(img_path).convert_alpha()
+            self.item_img = load_image(img_path)
             self.item_img = pygame.transform.scale(
                 self.item_img, (size[0] * 0.8, size[0] * 0.8)
             )
@@ -34,13 +36,18 @@ class SelectableItem:
 
         self.item_rect = self.item_img.get_rect(center=self.rect.center)
 
+        # Both looks of the item are composed up front, drawing only needs one blit
+        self.image.blit(self.item_img, self.item_rect)
+        self.image_active = pygame.surface.Surface(size, pygame.SRCALPHA)
+        self.image_active.fill((75, 75, 75, 80))
+        self.image_active.blit(self.item_img, self.item_rect)
+
+        memory.track(self, item_id)
+
     def draw(self, dest_surface: pygame.Surface, is_active: Optional[bool] = None):
         """Draw this SelectableItem onto dest_surface.
         If the item is set as active, the background will be gray."""
         if is_active:
-            self.image.fill((75, 75, 75, 80))
-        else:
-            self.image.fill((0, 0, 0, 0))
+            return dest_surface.blit(self.image_active, self.rect)
 
-        self.image.blit(self.item_img, self.item_rect)
         return dest_surface.blit(self.image, self.rect)
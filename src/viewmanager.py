@@ -1,8 +1,18 @@
 """View manager"""
 
+import gc
 import sys
 import pygame
-from src.views import View, Game, GameOver, Menu, Settings
+from src.config import (
+    DEBUG_ALLOCATIONS,
+    DEBUG_INPUT_LATENCY,
+    DEBUG_MEMORY,
+    GC_CONTROL,
+    MEMORY_REPORT_INTERVAL,
+    SPLIT_PROCESSES,
+)
+from src.diagnostics import allocations, input_latency, memory
+from src.views import View, Game, GameOver, Menu, Settings, SplitGame, SplitScreen
 import asyncio
 
 
@@ -17,28 +27,79 @@ class ViewManager:
             "difficulty_index": (0, 0),
             "car": "racing-blue-car.png",
             "car_index": (0, 0),
+            "players": 1,
         }
         self.views = {
-            "game": Game,
+            # Processes can't be started in the browser
+            "game": (
+                SplitGame if SPLIT_PROCESSES and sys.platform != "emscripten" else Game
+            ),
             "gameover": GameOver,
             "menu": Menu,
             "settings": Settings,
+            "splitscreen": SplitScreen,
         }
 
+        if DEBUG_MEMORY:
+            View.scheduler.add(
+                memory.periodic_report(MEMORY_REPORT_INTERVAL), "memory report"
+            )
+
+        self._view_generation = memory.begin_view("menu")
         self.current_view = Menu(self.state)
 
         asyncio.run(self.show_view(self.current_view))
 
     async def show_view(self, view: View) -> None:
         """Display a view.
-        Transitions to new view if one is set when the initial view isn't active anymore.
+        Transitions to new views for as long as the active view sets one when it ends.
         """
-        await view.run()
+        # A loop (instead of recursion) makes sure views which have ended can be freed
+        while True:
+            if GC_CONTROL:
+                self._pause_gc(view)
+
+            await view.run()
+
+            if GC_CONTROL:
+                self._resume_gc()
+
+            if DEBUG_ALLOCATIONS:
+                print(allocations.format_report(type(view).__name__), file=sys.stderr)
+                allocations.reset()
+
+            if DEBUG_INPUT_LATENCY:
+                print(input_latency.format_report(type(view).__name__), file=sys.stderr)
+                input_latency.reset()
+
+            if not view.transition_to:
+                break
+
+            ended_generation = self._view_generation
+            self._view_generation = memory.begin_view(view.transition_to)
 
-        if view.transition_to:
             # Get the View class we're transitioning to
             move_to = self.views[view.transition_to]
-            await self.show_view(move_to(view.state))
-        else:
-            pygame.quit()
-            sys.exit()
+            view = self.current_view = move_to(view.state)
+
+            if DEBUG_MEMORY:
+                memory.check_leaks(ended_generation)
+
+        pygame.quit()
+        sys.exit()
+
+    def _pause_gc(self, view: View) -> None:
+        """Collect garbage and freeze everything loaded so far, so it's never scanned again.
+        Automatic collection is turned off for views which pause it,
+        the view then collects young objects every GC_YOUNG_INTERVAL seconds itself.
+        """
+        gc.collect()
+        gc.freeze()
+
+        if view.pause_gc:
+            gc.disable()
+
+    def _resume_gc(self) -> None:
+        """Undo _pause_gc(), making the objects of the ended view collectable again"""
+        gc.unfreeze()
+        gc.enable()
@@ -2,6 +2,8 @@
 
 from .view import View
 from .game import Game
+from .splitgame import SplitGame
+from .splitscreen import SplitScreen
 from .settings import Settings
 from .menu import Menu
 from .gameover import GameOver
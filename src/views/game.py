@@ -1,17 +1,51 @@
 """Game view"""
 
+import struct
+import sys
+from random import Random
 from typing import Literal
-from random import randint
 import pygame
+from src import display
+from src.collision import collision_tables, swept_collide
 from src.views.view import View
 from src.sprites import Player, Background, Coin, Obstacle, Explosion
-from src.config import HEIGHT, LEVELS, WIDTH, INITIAL_SPEED
+from src.config import HEIGHT, LEVELS, WIDTH, INITIAL_SPEED, SNAPSHOT_FILE
+from src.snapshot import (
+    SnapshotError,
+    SnapshotMismatch,
+    SnapshotReader,
+    SnapshotWriter,
+    delete_snapshot,
+    load_snapshot,
+    new_snapshot,
+    open_snapshot,
+    save_snapshot,
+    skin_index,
+    skin_path,
+)
+from src.traffic import TrafficGenerator
 from src.utils import asset_path
 
+OBJECT_WIDTHS = {"coin": 32, "obstacle": 64}
+LEFT_KEYS = (pygame.K_a, pygame.K_LEFT)
+RIGHT_KEYS = (pygame.K_d, pygame.K_RIGHT)
+
+# distance
+_SPRITES_STATE = struct.Struct("<I")
+# lane, x, y, animation frame counter, animation sprite
+_COIN = struct.Struct("<BhhBB")
+# lane, x, y, skin
+_OBSTACLE = struct.Struct("<BhhB")
+# score, speed, frame_count
+_GAME_STATE = struct.Struct("<IHI")
+
 
 class GameSpriteManager:
     """Class managing spawning, despawning and updating sprites.
-    Used by the Game view."""
+    Used by the Game view.
+
+    Despawned coins and obstacles are kept and reused for new ones,
+    so no sprites have to be created while playing."""
 
     def __init__(self, state: dict) -> None:
         self.level = LEVELS[state["difficulty"]]
@@ -19,208 +53,468 @@ class GameSpriteManager:
         car_name = state["car"]
         self.player = Player(asset_path(f"sprites/cars/{car_name}"), self.level)
         self.background = Background(self.level)
-        self.coins: pygame.sprite.Group[Coin] = pygame.sprite.Group()
-        self.obstacles: pygame.sprite.Group[Obstacle] = pygame.sprite.Group()
+        self.coins: list[Coin] = []
+        self.obstacles: list[Obstacle] = []
+        self._coin_pool: list[Coin] = []
+        self._obstacle_pool: list[Obstacle] = []
 
         # Special sprite which is rendered manually and managed by the Game view
         self.explosion = Explosion()
 
+        # How far the road has moved, objects are planned ahead by the traffic generator
+        self.distance = 0
+        # How far the road moved in the last frame, which collisions are swept over
+        self.frame_distance = 0
+        # Road objects tested for collisions with the player
+        self.collision_checks = 0
+        self.rng = Random()
+        self.traffic = TrafficGenerator(self.level, self.rng)
+
     def update(self, speed: int) -> None:
         """Update game sprites"""
+        self.distance += speed
+        self.frame_distance = speed
         self.background.update(speed)
-        self.coins.update(speed)
-        self.obstacles.update(speed)
+
+        for coin in self.coins:
+            coin.update(speed)
+
+        for obstacle in self.obstacles:
+            obstacle.update(speed)
+
         self.player.update()
 
     def spawn_road_objects(self, speed: int) -> None:
-        """Spawn road objects for a new frame, if needed."""
-        if len(self.coins) < speed:
-            diff = speed - len(self.coins)
-            if diff < 3:
-                self._add_road_objects("coin", diff, speed)
-            else:
-                self._add_road_objects("coin", 3, speed)
+        """Spawn the planned road objects which are due in a new frame."""
+        self.traffic.speed = speed
 
-        if len(self.obstacles) < speed // 2:
-            diff = speed // 2 - len(self.obstacles)
-            if diff < 3:
-                self._add_road_objects("obstacle", diff, speed)
+        while (planned := self.traffic.pop_due(self.distance)) is not None:
+            pos_x = self._lane_x(planned.lane, OBJECT_WIDTHS[planned.kind])
+            pos_y = self.distance - planned.distance
+
+            if planned.kind == "obstacle":
+                self._spawn_obstacle((pos_x, pos_y), planned.lane, planned.skin)
             else:
-                self._add_road_objects("obstacle", 3, speed)
+                self._spawn_coin((pos_x, pos_y), planned.lane)
+
+    def _spawn_coin(
+        self,
+        position: tuple[int, int],
+        lane: int,
+        animation_frame: tuple[int, int] = (0, 0),
+    ) -> None:
+        """Spawn a coin, reusing a despawned one if possible"""
+        coin = self._coin_pool.pop() if self._coin_pool else Coin(position, lane)
+        coin.reset(position, lane, animation_frame)
+
+        self.coins.append(coin)
+
+    def _spawn_obstacle(self, position: tuple[int, int], lane: int, skin: str) -> None:
+        """Spawn an obstacle, reusing a despawned one if possible"""
+        if self._obstacle_pool:
+            obstacle = self._obstacle_pool.pop()
+            obstacle.reset(position, lane, skin)
+        else:
+            obstacle = Obstacle(position, lane, skin)
+
+        self.obstacles.append(obstacle)
 
     def despawn_obsolete(self) -> None:
         """Despawn road objects which are no longer visible."""
-        for coin in self.coins:
-            if coin.rect.top > HEIGHT:
-                self.coins.remove(coin)
+        # Backwards, so removing an object doesn't skip the next one
+        for i in range(len(self.coins) - 1, -1, -1):
+            if self.coins[i].rect.top > HEIGHT:
+                self._coin_pool.append(self.coins.pop(i))
+
+        for i in range(len(self.obstacles) - 1, -1, -1):
+            if self.obstacles[i].rect.top > HEIGHT:
+                self._obstacle_pool.append(self.obstacles.pop(i))
+
+    def colliding_obstacle(self) -> Obstacle | None:
+        """Find an obstacle the player has crashed into.
+        Obstacles are tested over all of the road they moved in the last frame,
+        so they can't skip past the player at high speeds."""
+        player = self.player
+        distance = self.frame_distance
+        self.collision_checks += len(self.obstacles)
 
         for obstacle in self.obstacles:
-            if obstacle.rect.top > HEIGHT:
-                self.obstacles.remove(obstacle)
+            if collision_tables.collide(player, obstacle, distance):
+                return obstacle
+
+        return None
+
+    def collect_coins(self) -> int:
+        """Despawn the coins the player has collected.
+        Returns the amount of coins collected."""
+        player = self.player
+        collected = 0
+        self.collision_checks += len(self.coins)
+
+        for i in range(len(self.coins) - 1, -1, -1):
+            coin = self.coins[i]
+            if swept_collide(player, coin, self.frame_distance):
+                self._coin_pool.append(self.coins.pop(i))
+                collected += 1
+
+        return collected
 
     def spawn_explosion(self, collided_with: Obstacle) -> None:
         """Spawns an explosion in the point of collision between the player and collided_with.
         Only supposed to be used when the game is over."""
-        overlap_pos = list(
-            self.player.mask.overlap(
-                collided_with.mask,
-                (
-                    collided_with.rect.x - self.player.rect.x,
-                    collided_with.rect.y - self.player.rect.y,
-                ),
-            )
+        # At high speeds the obstacle may have moved past the point where it first hit the player
+        contact = collision_tables.collide(
+            self.player, collided_with, self.frame_distance
         )
+
         # Collisions which are (nearly) head-on, should have it's explosion center at midtop of car
         # Needs to be checked, because otherwise overlap()'s first point is used
         # (usually top left, as the function checks for collisions iterably in the mask)
-        if overlap_pos[1] < 10:
+        if contact is None or contact[1] < 10:
             self.explosion.rect.center = self.player.rect.midtop
         else:
-            overlap_pos[0] += self.player.rect.x
-            overlap_pos[1] += self.player.rect.y
-            self.explosion.rect.centerx = overlap_pos[0]
-            self.explosion.rect.centery = overlap_pos[1]
-
-    def road_position_free(self, lane: int, new_rect: pygame.Rect) -> bool:
-        """Check if a position on the road,
-        specified by lane and the rectangle of the object about to be spawned,
-        isn't occupied by any other objects.
-        This is to avoid layered objects on top of each other.
-        Returns a bool indicating if the position is free."""
-
-        obstacles_on_same_lane = [o.rect for o in self.obstacles if o.lane == lane]
-        coins_on_same_lane = [c.rect for c in self.coins if c.lane == lane]
-
-        if (
-            new_rect.collidelist(obstacles_on_same_lane) != -1
-            or new_rect.collidelist(coins_on_same_lane) != -1
-        ):
-            return False
-
-        return True
-
-    def _add_road_objects(
-        self, obj: Literal["obstacle", "coin"], amount: int, speed: int
+            self.explosion.rect.centerx = contact[0] + self.player.rect.x
+            self.explosion.rect.centery = contact[1] + self.player.rect.y
+
+    def show_road_objects(
+        self,
+        coins: list[tuple[int, int, int]],
+        obstacles: list[tuple[int, int, str]],
     ) -> None:
-        """Add/spawn multiple road objects (obstacles or coins)"""
+        """Replace the road objects with coins at (x, y, animation sprite)
+        and obstacles at (x, y, skin), reusing the current ones.
+        Used to show a game which is simulated elsewhere."""
+        self._coin_pool.extend(self.coins)
+        self.coins.clear()
+        for pos_x, pos_y, sprite in coins:
+            self._spawn_coin((pos_x, pos_y), 0, (0, sprite))
+
+        self._obstacle_pool.extend(self.obstacles)
+        self.obstacles.clear()
+        for pos_x, pos_y, skin in obstacles:
+            self._spawn_obstacle((pos_x, pos_y), 0, skin)
+
+    def snapshot(self, writer: SnapshotWriter) -> None:
+        """Add the road, its objects, the player and the random number generator to a snapshot"""
+        writer.write(_SPRITES_STATE, self.distance)
+        writer.write_random(self.rng)
+        self.background.snapshot(writer)
+        self.player.snapshot(writer)
+
+        writer.write_count(len(self.coins))
+        for coin in self.coins:
+            writer.write(
+                _COIN, coin.lane, coin.rect.x, coin.rect.y, *coin.animation_frame
+            )
+
+        writer.write_count(len(self.obstacles))
+        for obstacle in self.obstacles:
+            writer.write(
+                _OBSTACLE,
+                obstacle.lane,
+                obstacle.rect.x,
+                obstacle.rect.y,
+                skin_index(obstacle.img_path),
+            )
+
+        self.traffic.snapshot(writer)
+
+    def restore(self, reader: SnapshotReader) -> None:
+        """Restore the state saved by snapshot().
+        Road objects are taken from the pools, so restoring doesn't create sprites once warmed up.
+        """
+        (self.distance,) = reader.read(_SPRITES_STATE)
+        reader.read_random(self.rng)
+        self.background.restore(reader)
+        self.player.restore(reader)
+
+        self._coin_pool.extend(self.coins)
+        self.coins.clear()
+        for _ in range(reader.read_count()):
+            lane, pos_x, pos_y, frame_counter, sprite = reader.read(_COIN)
+            self._spawn_coin((pos_x, pos_y), lane, (frame_counter, sprite))
+
+        self._obstacle_pool.extend(self.obstacles)
+        self.obstacles.clear()
+        for _ in range(reader.read_count()):
+            lane, pos_x, pos_y, skin = reader.read(_OBSTACLE)
+            self._spawn_obstacle((pos_x, pos_y), lane, skin_path(skin))
+
+        self.traffic.restore(reader, self.distance)
+
+    def _lane_x(self, lane: int, object_width: int) -> int:
+        """x coordinate of an object centered in lane"""
+        # Distance to start of road + 30px side line + x_lanes*lane_width - (1/2)*(lane_width - 10px) - 10px (white line) - 1/2 object width
         lane_width = self.level["lane_width"]
         distance_to_road = self.background.rect.left
-        obstacle_width = 64
-        coin_width = 32
+        return (
+            distance_to_road
+            + 30
+            + lane * lane_width
+            - (lane_width - 10) // 2
+            - 10
+            - object_width // 2
+        )
 
-        for _ in range(amount):
-            lane = randint(1, self.level["lanes"])  # type: ignore
-            height = randint(50, 400)
+    def draw(self, dest_surface: pygame.Surface) -> None:
+        """Draw all game sprites onto dest_surface."""
+        self.background.draw(dest_surface)
 
-            # x coordinate:
-            # Distance to start of road + 30px side line + x_lanes*lane_width - (1/2)*(lane_width - 10px) - 10px (white line) - 1/2 object width
-            pos_x = distance_to_road + 30 + lane * lane_width - (lane_width - 10) // 2 - 10  # type: ignore
+        # Each sprite draws itself, so sprites can choose what (or which area) to blit
+        for coin in self.coins:
+            coin.draw(dest_surface)
 
-            if obj == "obstacle":
-                pos_x -= obstacle_width // 2
-                new_rect = pygame.rect.Rect((pos_x, -height, 64, 64))
+        for obstacle in self.obstacles:
+            obstacle.draw(dest_surface)
 
-                # If the position on the road isn't free, re-randomize the height
-                while not self.road_position_free(lane, new_rect):
-                    height = randint(50, speed * 100)
-                    new_rect.y = -height
+        self.player.draw(dest_surface)
 
-                self.obstacles.add(Obstacle((pos_x, -height), lane))
-            elif obj == "coin":
-                pos_x -= coin_width // 2
-                new_rect = pygame.rect.Rect((pos_x, -height, 32, 32))
 
-                while not self.road_position_free(lane, new_rect):
-                    height = randint(50, speed * 100)
-                    new_rect.y = -height
+class GameSession:
+    """The simulation of one game, without any drawing or sound.
+    Used by the Game view, and by the simulation process of the SplitGame view.
 
-                self.coins.add(Coin((pos_x, -height), lane))
+    Sounds to be played are counted instead, so whoever shows the game can play one
+    whenever a count changes."""
 
-    def draw(self, dest_surface: pygame.Surface) -> None:
-        """Draw all game sprites onto dest_surface."""
-        self.background.draw(dest_surface)
-        self.coins.draw(dest_surface)
-        self.obstacles.draw(dest_surface)
-        self.player.draw(dest_surface)
+    def __init__(self, state: dict) -> None:
+        self.state = state
+        self.sprites = GameSpriteManager(state)
+
+        self.frame_count = 0
+        self.speed = INITIAL_SPEED
+        self.score = 0
+
+        self.exploding = False
+        # Set once the explosion has finished, and the game is over
+        self.finished = False
+
+        self.coin_sounds = 0
+        self.explosion_sounds = 0
+
+    def step(self) -> None:
+        """Simulate one frame"""
+        sprites = self.sprites
+
+        # Special state: While explosion is happening,
+        # (before moving to game over screen), no other updates are executed
+        if self.exploding:
+            sprites.explosion.update()
+            if sprites.explosion.animation_finished:
+                self.finished = True
+            return
+
+        sprites.update(self.speed)
+        sprites.spawn_road_objects(self.speed)
+        sprites.despawn_obsolete()
+
+        collided = sprites.colliding_obstacle()
+
+        if collided:
+            self.exploding = True
+            self.explosion_sounds += 1
+            sprites.spawn_explosion(collided)
+
+        coins_collected = sprites.collect_coins()
+
+        if coins_collected:
+            self.score += coins_collected
+
+            if self.score % 10 == 0:
+                self.coin_sounds += 1
+
+        self.frame_count += 1
+        # Each "speed level" duration is constantly increasing
+        # (speed is 2 for 1200 frames, speed is 5 for 6000 frames, etc)
+        if self.frame_count >= self.speed * 600:
+            self.frame_count = 0
+            self.speed += 1
+
+    def snapshot(self) -> bytes:
+        """Save the running game in a compact binary format"""
+        writer = new_snapshot(self.state["difficulty"], self.state["car"])
+        writer.write(_GAME_STATE, self.score, self.speed, self.frame_count)
+        self.sprites.snapshot(writer)
+        return writer.getvalue()
+
+    def restore(self, data: bytes) -> None:
+        """Continue a game saved by snapshot().
+        The game has to be played with the same difficulty and car as the saved one.
+        The snapshot is restored into a new session first, so this one is left as it was
+        if the snapshot turns out to be invalid halfway through."""
+        GameSession(self.state)._restore(data)
+        self._restore(data)
+
+    def _restore(self, data: bytes) -> None:
+        """Restore a snapshot into this session, possibly leaving it half restored on errors"""
+        reader, difficulty, car = open_snapshot(data)
+        if (difficulty, car) != (self.state["difficulty"], self.state["car"]):
+            raise SnapshotMismatch(f"Snapshot is of a game on {difficulty} with {car}")
+
+        try:
+            self.score, self.speed, self.frame_count = reader.read(_GAME_STATE)
+            self.sprites.restore(reader)
+        except (IndexError, ValueError) as err:
+            # Out of range indices, e.g. of lane switch states or road object kinds
+            raise SnapshotError(f"Snapshot is corrupt: {err}") from err
+
+    def resume_saved(self) -> None:
+        """Continue the game saved when the game was last quit, if there is one and it can be.
+        The saved game is deleted once it has been resumed, or if it's invalid."""
+        if not SNAPSHOT_FILE or not (data := load_snapshot(SNAPSHOT_FILE)):
+            return
+
+        try:
+            self.restore(data)
+        except SnapshotMismatch as err:
+            # Kept for the next game on the same difficulty and with the same car
+            print(f"Not resuming saved game: {err}", file=sys.stderr)
+            return
+        except SnapshotError as err:
+            print(f"Discarding invalid saved game: {err}", file=sys.stderr)
+
+        try:
+            delete_snapshot(SNAPSHOT_FILE)
+        except OSError as err:
+            print(f"Could not delete the saved game: {err}", file=sys.stderr)
+
+    def save(self) -> None:
+        """Save the running game, so it's resumed on the next start"""
+        if not SNAPSHOT_FILE or self.exploding:
+            return
+
+        try:
+            save_snapshot(SNAPSHOT_FILE, self.snapshot())
+        except OSError as err:
+            print(f"Could not save the game: {err}", file=sys.stderr)
 
 
 class Game(View):
     """Main game view class"""
 
+    pause_gc = True
+
     def __init__(self, state: dict) -> None:
         super().__init__(state)
-        pygame.display.set_caption("Traffic Evader")
+        display.set_caption("Traffic Evader")
 
-        self.sprites = GameSpriteManager(self.state)
+        self.session = GameSession(self.state)
+        self.sprites = self.session.sprites
 
         self.score_text = self.fonts.font_score.render("0", True, "black")
+        self.score_pos = (WIDTH - 100, 25)
 
-        self.frame_count = 0
-        self.speed = INITIAL_SPEED
-        self.score = 0
-
+        # What has been shown and played of the session so far
+        self._shown_score = 0
+        self._coin_sounds = 0
+        self._explosion_sounds = 0
         self.exploding = False
 
+        # Sounds are decoded before playing, so the first one doesn't cause a hitch
+        self.sounds.preload()
+
+        self.start_simulation()
+
+    def start_simulation(self) -> None:
+        """Start simulating the session, resuming a saved game if there is one"""
+        self.scheduler.add(self.sprites.traffic.task(), "traffic")
+        self.scheduler.add(
+            collision_tables.task(self.sprites.player.img_path), "collision-tables"
+        )
+        self.session.resume_saved()
+
+    def snapshot(self) -> bytes:
+        """Save the running game in a compact binary format"""
+        return self.session.snapshot()
+
+    def restore(self, data: bytes) -> None:
+        """Continue a game saved by snapshot()"""
+        self.session.restore(data)
+
+    def exit(self) -> None:
+        """Save the running game before quitting, so it's resumed on the next start"""
+        self.session.save()
+        super().exit()
+
+    def steer(self, direction: Literal["left", "right"]) -> None:
+        """Start a lane switch, if the player isn't switching lanes already"""
+        if direction == "left":
+            self.sprites.player.move_left()
+        else:
+            self.sprites.player.move_right()
+
     def process_input(self) -> None:
-        for event in pygame.event.get():
+        for event in self.get_events():
             if event.type == pygame.QUIT:
                 self.exit()
+            # Key presses switch lanes right away, even if the key is let go before the next frame
+            elif event.type == pygame.KEYDOWN and event.key in LEFT_KEYS:
+                self.steer("left")
+            elif event.type == pygame.KEYDOWN and event.key in RIGHT_KEYS:
+                self.steer("right")
 
+        # Holding a key keeps switching lanes
         keys = pygame.key.get_pressed()
 
         if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-            self.sprites.player.move_left()
+            self.steer("left")
         elif keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-            self.sprites.player.move_right()
+            self.steer("right")
 
     def update(self) -> None:
-        # Special state: While explosion is happening,
-        # (before moving to game over screen), no other updates are executed
-        if self.exploding:
-            self.sprites.explosion.update()
-            if self.sprites.explosion.animation_finished:
-                self.active = False
-            return
-
-        self.sprites.update(self.speed)
-        self.sprites.spawn_road_objects(self.speed)
-        self.sprites.despawn_obsolete()
-
-        collided = pygame.sprite.spritecollideany(
-            self.sprites.player, self.sprites.obstacles, pygame.sprite.collide_mask
+        self.session.step()
+        self.follow_session(
+            self.session.score,
+            self.session.coin_sounds,
+            self.session.explosion_sounds,
+            self.session.finished,
         )
 
-        if collided:
+    def report_metrics(self, metrics) -> None:
+        super().report_metrics(metrics)
+        sprites = self.sprites
+        traffic = sprites.traffic
+
+        metrics.gauge("game.score", self._shown_score)
+        metrics.gauge("game.speed", self.session.speed)
+        metrics.gauge("objects.coins", len(sprites.coins))
+        metrics.gauge("objects.obstacles", len(sprites.obstacles))
+        metrics.gauge("objects.planned", len(traffic.queue))
+        metrics.count_total("traffic.sync_segments", traffic.sync_segments)
+        metrics.count_total("traffic.rejected", traffic.rejected)
+        metrics.count_total("collision.checks", sprites.collision_checks)
+
+    def follow_session(
+        self, score: int, coin_sounds: int, explosion_sounds: int, finished: bool
+    ) -> None:
+        """Play the session's new sounds, show its score and end the view once it's over"""
+        if explosion_sounds != self._explosion_sounds:
+            self._explosion_sounds = explosion_sounds
+            self.sounds.play("explosion")
             self.exploding = True
-            self.sounds.explosion.play()
-            self.sprites.spawn_explosion(collided)
             self.transition_to = "gameover"
 
-        # Third argument specifies to remove any coins collected from the coin sprite group
-        coins_collected = pygame.sprite.spritecollide(
-            self.sprites.player, self.sprites.coins, True, pygame.sprite.collide_mask
-        )
-
-        self.score += len(coins_collected)
-        if len(coins_collected) > 0 and self.score % 10 == 0:
-            self.sounds.coin.play()
+        if coin_sounds != self._coin_sounds:
+            self._coin_sounds = coin_sounds
+            self.sounds.play("coin")
 
-        self.score_text = self.fonts.font_score.render(str(self.score), True, "black")
+        if score != self._shown_score:
+            self._shown_score = score
+            self.score_text = self.fonts.font_score.render(str(score), True, "black")
 
-        self.frame_count += 1
-        # Each "speed level" duration is constantly increasing
-        # (speed is 2 for 1200 frames, speed is 5 for 6000 frames, etc)
-        if self.frame_count >= self.speed * 600:
-            self.frame_count = 0
-            self.speed += 1
+        if finished:
+            self.state["score"] = score
+            self.active = False
+            self.scheduler.cancel("traffic")
 
     def render(self) -> None:
         self.screen.fill((255, 255, 255))
 
         self.sprites.draw(self.screen)
-        self.screen.blit(self.score_text, (WIDTH - 100, 25))
+        self.screen.blit(self.score_text, self.score_pos)
 
         if self.exploding:
             self.sprites.explosion.draw(self.screen)
 
-        pygame.display.flip()
+        # The game over view is drawn on top of the last frame
+        display.present(keep_frame=not self.active)
@@ -1,14 +1,18 @@
 """Game over view"""
 
 import pygame
+from src import display
 from src.views.view import View
 from src.ui import Button
-from src.config import WIDTH, HEIGHT
+from src.config import WIDTH, HEIGHT, LEADERBOARD_PLAYER_NAME, LEADERBOARD_TOP
+from src.leaderboard import LEADERBOARD_UPDATED, get_client
 
 
 class GameOver(View):
     """Game over view class"""
 
+    event_driven = True
+
     def __init__(self, state: dict) -> None:
         super().__init__(state)
 
@@ -26,23 +30,76 @@ class GameOver(View):
 
         self.buttons = [self.retry, self.back, self.exit_btn]
 
-        self.overlay = pygame.surface.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        self.overlay.fill((50, 50, 50, 150))
-        self.overlay_blitted = False
+        # A split screen game shows every player's score
+        self.scores = None
+        if self.state["players"] > 1:
+            self.scores = self.fonts.font_button.render(
+                "   ".join(
+                    f"P{number} {score}"
+                    for number, score in enumerate(self.state["scores"], 1)
+                ),
+                True,
+                "black",
+                (255, 255, 255),
+            )
+
+        # The last game frame is kept, so the view can be redrawn on top of it
+        self.background = self.screen.copy()
+        overlay = pygame.surface.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((50, 50, 50, 150))
+        self.background.blit(overlay, (0, 0))
+
+        # The run is sent and the top scores fetched in the background,
+        # they are shown when LEADERBOARD_UPDATED arrives
+        self.top_scores: list[pygame.Surface] = []
+        self.leaderboard = get_client()
+        if self.leaderboard:
+            if self.state["players"] > 1:
+                for number, score in enumerate(self.state["scores"], 1):
+                    self.leaderboard.submit(
+                        f"{LEADERBOARD_PLAYER_NAME} {number}",
+                        score,
+                        self.state["difficulty"],
+                    )
+            else:
+                self.leaderboard.submit(
+                    LEADERBOARD_PLAYER_NAME,
+                    self.state.get("score", 0),
+                    self.state["difficulty"],
+                )
+            self.leaderboard.request_top(LEADERBOARD_TOP, self.state["difficulty"])
+
+    def _render_top_scores(self) -> None:
+        """Render a line of text for each of the fetched top scores"""
+        if not self.leaderboard or self.leaderboard.top_scores is None:
+            return
+
+        self.top_scores = [
+            self.fonts.font_button.render(
+                f"{place}. {entry['name']}  {entry['score']}",
+                True,
+                "black",
+                (255, 255, 255),
+            )
+            for place, entry in enumerate(self.leaderboard.top_scores, 1)
+        ]
+        self.dirty = True
 
     def process_input(self) -> None:
-        for event in pygame.event.get():
+        for event in self.get_events():
             if event.type == pygame.QUIT:
                 self.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
                 for button in self.buttons:
-                    button.click_event()
+                    button.click_event(event.pos)
+            if event.type == LEADERBOARD_UPDATED:
+                self._render_top_scores()
 
         if self.retry.clicked or self.back.clicked:
             self.active = False
 
         if self.retry.clicked:
-            self.transition_to = "game"
+            self.transition_to = "game" if self.state["players"] == 1 else "splitscreen"
 
         if self.back.clicked:
             self.transition_to = "menu"
@@ -51,9 +108,7 @@ class GameOver(View):
             self.exit()
 
     def render(self) -> None:
-        if not self.overlay_blitted:
-            self.screen.blit(self.overlay, (0, 0))
-            self.overlay_blitted = True
+        self.screen.blit(self.background, (0, 0))
 
         for button in self.buttons:
             button.draw(self.screen)
@@ -62,4 +117,16 @@ class GameOver(View):
             self.title, ((WIDTH - self.title.get_width()) // 2, HEIGHT - 450)
         )
 
-        pygame.display.flip()
+        top_scores_y = HEIGHT // 2 + 80
+        if self.scores:
+            self.screen.blit(
+                self.scores, ((WIDTH - self.scores.get_width()) // 2, top_scores_y)
+            )
+            top_scores_y += 36
+
+        for line, text in enumerate(self.top_scores):
+            self.screen.blit(
+                text, ((WIDTH - text.get_width()) // 2, top_scores_y + line * 26)
+            )
+
+        display.present()
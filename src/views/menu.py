@@ -1,6 +1,7 @@
 """Game menu view"""
 
 import pygame
+from src import display
 from src.views.view import View
 from src.ui import Button
 from src.config import WIDTH, HEIGHT
@@ -9,9 +10,11 @@ from src.config import WIDTH, HEIGHT
 class Menu(View):
     """Main menu view class"""
 
+    event_driven = True
+
     def __init__(self, state: dict) -> None:
         super().__init__(state)
-        pygame.display.set_caption("Traffic Evader")
+        display.set_caption("Traffic Evader")
 
         self.title = self.fonts.font_title.render("Traffic Evader", True, "black")
 
@@ -24,20 +27,20 @@ class Menu(View):
         self.buttons = [self.play, self.settings, self.exit_btn]
 
     def process_input(self) -> None:
-        for event in pygame.event.get():
+        for event in self.get_events():
             if event.type == pygame.QUIT:
                 self.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
                 for button in self.buttons:
-                    button.click_event()
+                    button.click_event(event.pos)
 
         if self.play.clicked:
-            self.sounds.click.play()
+            self.sounds.play("click")
             self.active = False
-            self.transition_to = "game"
+            self.transition_to = "game" if self.state["players"] == 1 else "splitscreen"
 
         if self.settings.clicked:
-            self.sounds.click.play()
+            self.sounds.play("click")
             self.active = False
             self.transition_to = "settings"
 
@@ -54,4 +57,4 @@ class Menu(View):
             self.title, ((WIDTH - self.title.get_width()) // 2, HEIGHT - 450)
         )
 
-        pygame.display.flip()
+        display.present()
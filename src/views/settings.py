@@ -1,15 +1,18 @@
 """Game settings view"""
 
 import pygame
+from src import display
 from src.views.view import View
 from src.ui import Button, SelectableItem, ItemSelector
-from src.config import WIDTH, HEIGHT
+from src.config import WIDTH, HEIGHT, SPLIT_SCREEN_KEYS
 from src.utils import asset_path
 
 
 class Settings(View):
     """Game settings view class"""
 
+    event_driven = True
+
     def __init__(self, state: dict) -> None:
         super().__init__(state)
 
@@ -56,6 +59,20 @@ class Settings(View):
         self.diff_selector.rect.x = (WIDTH - self.diff_selector.rect.width) // 2
         self.diff_selector.rect.y = 150
 
+        # More than one player splits the screen
+        self.player_counts = [
+            [
+                SelectableItem(str(players), button_text=str(players), size=(80, 50))
+                for players in range(1, len(SPLIT_SCREEN_KEYS) + 1)
+            ]
+        ]
+
+        self.players_selector = ItemSelector(
+            self.player_counts, (0, self.state["players"] - 1)
+        )
+        self.players_selector.rect.x = (WIDTH - self.players_selector.rect.width) // 2
+        self.players_selector.rect.y = 360
+
         self.back = Button(
             (WIDTH // 2 - 110, HEIGHT - 150, 220, 50), text="Back to Menu"
         )
@@ -66,16 +83,20 @@ class Settings(View):
         self.state["difficulty"] = self.diff_selector.active_item.item_id
         self.state["car"] = self.car_selector.active_item.item_id
         self.state["car_index"] = self.car_selector.get_active_item_index()
+        self.state["players"] = int(self.players_selector.active_item.item_id)
 
     def process_input(self) -> None:
-        for event in pygame.event.get():
+        for event in self.get_events():
             if event.type == pygame.QUIT:
                 self.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self.diff_selector.process_input(mouse_pos)
-                self.car_selector.process_input(mouse_pos)
-                self.back.click_event()
+                if self.diff_selector.process_input(event.pos):
+                    self.dirty = True
+                if self.car_selector.process_input(event.pos):
+                    self.dirty = True
+                if self.players_selector.process_input(event.pos):
+                    self.dirty = True
+                self.back.click_event(event.pos)
 
         if self.back.clicked:
             self._set_state()
@@ -87,6 +108,7 @@ class Settings(View):
 
         self.diff_selector.draw(self.screen)
         self.car_selector.draw(self.screen)
+        self.players_selector.draw(self.screen)
         self.back.draw(self.screen)
 
-        pygame.display.flip()
+        display.present()
@@ -0,0 +1,104 @@
+"""Game view with the simulation in a separate process"""
+
+import multiprocessing
+from typing import Literal
+from src.sharedstate import (
+    MOVE_LEFT,
+    MOVE_RIGHT,
+    QUIT,
+    Frame,
+    SharedGameState,
+    run_simulation,
+)
+from src.views.game import Game
+from src.views.view import View
+
+
+class SplitGame(Game):
+    """Game view which only draws, while the game is simulated in another process.
+
+    The simulation publishes every frame through shared memory, and this view draws the
+    latest one it finds. Slow frames here therefore don't slow the game down,
+    and the game can use two cores. Input is sent to the simulation as commands.
+    The local session is never stepped, its sprites are only moved to where the simulation put them.
+    """
+
+    def start_simulation(self) -> None:
+        # Spawned, so the simulation doesn't inherit pygame's display and audio state
+        context = multiprocessing.get_context("spawn")
+        self.shared = SharedGameState(context)
+        self._stopped = False
+        # Latest frame of the simulation, whose counters are reported as metrics
+        self._frame: Frame | None = None
+
+        self.process = context.Process(
+            target=run_simulation,
+            args=(
+                {"difficulty": self.state["difficulty"], "car": self.state["car"]},
+                self.shared,
+            ),
+            name="simulation",
+            daemon=True,
+        )
+        self.process.start()
+
+    def _stop_simulation(self) -> None:
+        """Ask the simulation to save the game and end, and free the shared memory"""
+        if self._stopped:
+            return
+        self._stopped = True
+
+        if self.process.is_alive():
+            self.shared.push_input(QUIT)
+            self.process.join(2)
+
+        self.shared.close()
+
+    def exit(self) -> None:
+        self._stop_simulation()
+        View.exit(self)
+
+    def steer(self, direction: Literal["left", "right"]) -> None:
+        self.shared.push_input(MOVE_LEFT if direction == "left" else MOVE_RIGHT)
+
+    def report_metrics(self, metrics) -> None:
+        # The local session isn't stepped, so the simulation's own numbers come from its frames
+        View.report_metrics(self, metrics)
+        frame = self._frame
+        if frame is None:
+            return
+
+        metrics.gauge("game.score", frame.score)
+        metrics.gauge("game.speed", frame.speed)
+        metrics.gauge("objects.coins", len(frame.coins))
+        metrics.gauge("objects.obstacles", len(frame.obstacles))
+        metrics.gauge("objects.planned", frame.planned)
+        metrics.count_total("traffic.sync_segments", frame.sync_segments)
+        metrics.count_total("traffic.rejected", frame.rejected)
+        metrics.count_total("collision.checks", frame.collision_checks)
+
+    def update(self) -> None:
+        frame = self.shared.read_frame()
+
+        if frame is None:
+            # The simulation ended without finishing the game, e.g. because it crashed
+            if not self.process.is_alive():
+                self._stop_simulation()
+                self.active = False
+                self.transition_to = "menu"
+            return
+
+        self._frame = frame
+        sprites = self.sprites
+        sprites.background.scroll_to(frame.road_y, frame.side_y)
+        sprites.player.rect.x = frame.player_x
+        sprites.show_road_objects(frame.coins, frame.obstacles)
+        sprites.explosion.rect.center = frame.explosion_center
+        sprites.explosion.show_frame(frame.explosion_sprite)
+
+        self.follow_session(
+            frame.score, frame.coin_sounds, frame.explosion_sounds, frame.finished
+        )
+
+        if frame.finished:
+            self._stop_simulation()
@@ -0,0 +1,226 @@
+"""Split screen game view"""
+
+import pygame
+from src import display
+from src.collision import collision_tables
+from src.config import HEIGHT, SPLIT_SCREEN_KEYS, WIDTH
+from src.views.game import GameSession
+from src.views.view import View
+
+# Lines drawn between the viewports
+DIVIDER_WIDTH = 4
+
+
+def viewport_rects(players: int) -> list[pygame.Rect]:
+    """Split the screen into a viewport per player.
+    Two players get a column each, three or four a quarter of the screen each."""
+    if players == 1:
+        return [pygame.Rect(0, 0, WIDTH, HEIGHT)]
+
+    if players == 2:
+        return [
+            pygame.Rect(0, 0, WIDTH // 2, HEIGHT),
+            pygame.Rect(WIDTH // 2, 0, WIDTH // 2, HEIGHT),
+        ]
+
+    return [
+        pygame.Rect(
+            (number % 2) * WIDTH // 2,
+            (number // 2) * HEIGHT // 2,
+            WIDTH // 2,
+            HEIGHT // 2,
+        )
+        for number in range(players)
+    ]
+
+
+class SplitScreenPlayer:
+    """One player of a split screen game: its game session, viewport and keys.
+    Used by the SplitScreen view."""
+
+    def __init__(
+        self,
+        state: dict,
+        rect: pygame.Rect,
+        keys: tuple[str, str],
+        score_text: pygame.Surface,
+    ) -> None:
+        self.session = GameSession(state)
+        self.sprites = self.session.sprites
+
+        # The road is centered horizontally, and the player kept near the bottom
+        player_bottom = self.sprites.player.rect.bottom
+        camera = ((WIDTH - rect.width) // 2, max(player_bottom + 5 - rect.height, 0))
+        self.viewport = display.Viewport(display.get_screen(), rect, camera)
+
+        self.left_key = pygame.key.key_code(keys[0])
+        self.right_key = pygame.key.key_code(keys[1])
+
+        # What has been shown and played of the session so far
+        self.shown_score = 0
+        self.coin_sounds = 0
+        self.explosion_sounds = 0
+        self.score_text = score_text
+
+
+class SplitScreen(View):
+    """Game view for 2-4 players on one screen.
+
+    Every player has a game of their own, but all games are stepped in one loop and
+    drawn in one pass, each into its own viewport, and shown with a single present().
+    Sprite images and masks, collision tables, fonts and sounds are loaded once and shared,
+    so each additional player only costs its sprite positions and traffic planning.
+    """
+
+    pause_gc = True
+
+    def __init__(self, state: dict) -> None:
+        super().__init__(state)
+        display.set_caption("Traffic Evader")
+
+        rects = viewport_rects(self.state["players"])
+        score_text = self.fonts.font_score.render("0", True, "black")
+        self.players = [
+            SplitScreenPlayer(self.state, rect, keys, score_text)
+            for rect, keys in zip(rects, SPLIT_SCREEN_KEYS)
+        ]
+
+        self.game_over_text = self.fonts.font_title.render(
+            "Game Over", True, "black", (255, 255, 255)
+        )
+        # Three players leave a quarter of the screen empty
+        self.unused = [
+            rect for rect in viewport_rects(4)[len(rects) :] if len(rects) > 2
+        ]
+        # Lines between the viewports, drawn on top of them
+        self.dividers = [
+            pygame.Rect(
+                rect.right - DIVIDER_WIDTH // 2, rect.y, DIVIDER_WIDTH, rect.height
+            )
+            for rect in rects
+            if rect.right < WIDTH
+        ] + [
+            pygame.Rect(
+                rect.x, rect.bottom - DIVIDER_WIDTH // 2, rect.width, DIVIDER_WIDTH
+            )
+            for rect in rects
+            if rect.bottom < HEIGHT
+        ]
+
+        # Sounds are decoded before playing, so the first one doesn't cause a hitch
+        self.sounds.preload()
+
+        for number, player in enumerate(self.players, 1):
+            self.scheduler.add(player.sprites.traffic.task(), f"traffic {number}")
+        # All players drive the same car, so they share its collision tables
+        self.scheduler.add(
+            collision_tables.task(self.players[0].sprites.player.img_path),
+            "collision-tables",
+        )
+
+    def process_input(self) -> None:
+        players = self.players
+
+        for event in self.get_events():
+            if event.type == pygame.QUIT:
+                self.exit()
+            # Key presses switch lanes right away, even if the key is let go before the next frame
+            elif event.type == pygame.KEYDOWN:
+                for player in players:
+                    if event.key == player.left_key:
+                        player.sprites.player.move_left()
+                    elif event.key == player.right_key:
+                        player.sprites.player.move_right()
+
+        # Holding a key keeps switching lanes
+        keys = pygame.key.get_pressed()
+
+        for player in players:
+            if keys[player.left_key]:
+                player.sprites.player.move_left()
+            elif keys[player.right_key]:
+                player.sprites.player.move_right()
+
+    def update(self) -> None:
+        finished = 0
+
+        for player in self.players:
+            session = player.session
+            if session.finished:
+                finished += 1
+                continue
+
+            session.step()
+
+            if session.explosion_sounds != player.explosion_sounds:
+                player.explosion_sounds = session.explosion_sounds
+                self.sounds.play("explosion")
+
+            if session.coin_sounds != player.coin_sounds:
+                player.coin_sounds = session.coin_sounds
+                self.sounds.play("coin")
+
+            if session.score != player.shown_score:
+                player.shown_score = session.score
+                player.score_text = self.fonts.font_score.render(
+                    str(session.score), True, "black"
+                )
+
+        # The game is over once every player has crashed
+        if finished == len(self.players):
+            scores = [player.session.score for player in self.players]
+            self.state["scores"] = scores
+            self.state["score"] = max(scores)
+            self.active = False
+            self.transition_to = "gameover"
+
+            for number in range(1, len(self.players) + 1):
+                self.scheduler.cancel(f"traffic {number}")
+
+    def report_metrics(self, metrics) -> None:
+        super().report_metrics(metrics)
+        sessions = [player.session for player in self.players]
+
+        metrics.gauge("splitscreen.players", len(sessions))
+        metrics.gauge(
+            "splitscreen.playing", sum(not session.finished for session in sessions)
+        )
+        metrics.count_total(
+            "collision.checks",
+            sum(session.sprites.collision_checks for session in sessions),
+        )
+
+    def render(self) -> None:
+        screen = self.screen
+
+        for player in self.players:
+            viewport = player.viewport
+            viewport.begin()
+            viewport.fill((255, 255, 255))
+            player.sprites.draw(viewport)
+
+            if player.session.exploding:
+                player.sprites.explosion.draw(viewport)
+
+            viewport.end()
+
+            # The score and game over text are placed in screen coordinates
+            rect = viewport.rect
+            screen.blit(
+                player.score_text,
+                (rect.right - player.score_text.get_width() - 25, rect.y + 25),
+            )
+            if player.session.finished:
+                screen.blit(
+                    self.game_over_text,
+                    self.game_over_text.get_rect(center=rect.center),
+                )
+
+        for rect in self.unused:
+            screen.fill((255, 255, 255), rect)
+
+        for divider in self.dividers:
+            screen.fill("black", divider)
+
+        # The game over view is drawn on top of the last frame
+        display.present(keep_frame=not self.active)
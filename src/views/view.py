@@ -1,27 +1,54 @@
 """Base view module"""
 
 import asyncio
+import gc
 import sys
+import time
 import pygame
-from src.config import WIDTH, HEIGHT, FPS
-from src.storage import Fonts, Sounds
+from src import display
+from src.capture import get_capture
+from src.config import (
+    FPS,
+    DEBUG_ALLOCATIONS,
+    DEBUG_INPUT_LATENCY,
+    FRAME_PACING,
+    GC_YOUNG_INTERVAL,
+    PACING_BUSY_WAIT,
+)
+from src.diagnostics import allocations, get_metrics, input_latency, memory
+from src.scheduler import TaskScheduler
+from src.storage import Fonts, sounds
+
+EXPOSE_EVENTS = (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE)
 
 
 class View:
     """A base class for all game views with a game loop"""
 
+    # Views which only change in response to input can set this to True.
+    # They will then block on events and only render when self.dirty is set.
+    event_driven = False
+
+    # Shared by all views, so background work can outlive a view
+    scheduler = TaskScheduler()
+
+    # Views with an allocation-free game loop can pause the garbage collector
+    pause_gc = False
+
     def __init__(self, state: dict) -> None:
-        if pygame.display.get_active():
-            self.screen = pygame.display.get_surface()
-        else:
-            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.screen = display.get_screen()
+        self.capture = get_capture(self.screen)
+        self.metrics = get_metrics()
 
         self.clock = pygame.time.Clock()
         self.fonts = Fonts()
-        self.sounds = Sounds()
+        self.sounds = sounds
         self.active = True
         self.transition_to: str | None = None
         self.state = state
+        self.dirty = True
+
+        memory.track(self, type(self).__name__)
 
     def process_input(self) -> None:
         """Game loop part 1: Process game inputs.
@@ -36,13 +63,111 @@ class View:
         Override this method when inheriting.
         """
 
+    def get_events(self) -> list[pygame.event.Event]:
+        """Take all events off the queue, like pygame.event.get().
+        Views should use this, so the latency of input events can be measured."""
+        events = pygame.event.get()
+
+        if DEBUG_INPUT_LATENCY:
+            for event in events:
+                input_latency.input(event)
+            input_latency.taken()
+
+        return events
+
+    def _observe_input(self) -> None:
+        """Note whether input has arrived, to narrow down when it did"""
+        if DEBUG_INPUT_LATENCY:
+            pygame.event.pump()
+            input_latency.observe()
+
+    def _wait_for_frame(self) -> None:
+        """Wait until it's time for the next frame"""
+        self._observe_input()
+
+        # Busy looping would freeze the browser tab
+        if PACING_BUSY_WAIT and sys.platform != "emscripten":
+            self.clock.tick_busy_loop(FPS)
+        else:
+            self.clock.tick(FPS)
+
+        self._observe_input()
+
+    def report_metrics(self, metrics) -> None:
+        """Add the view's metrics before they are sent.
+        Extend this method to add more when inheriting."""
+        metrics.gauge(f"view.{type(self).__name__.lower()}", 1)
+        metrics.count_total("scheduler.deferred_frames", self.scheduler.deferred_frames)
+
+    def _wait_for_input(self) -> None:
+        """Block until an event arrives, unless there is something to redraw.
+        The event is put back onto the queue so process_input() can handle it."""
+        # Blocking would freeze the browser tab, so only skip rendering there
+        if not self.dirty and sys.platform != "emscripten":
+            # Wake up every frame while there is background work to do
+            timeout = round(1000 / FPS) if self.scheduler.pending else 0
+            # and when the metrics are due, so an idle view still sends them
+            if self.metrics:
+                until_flush = max(round(self.metrics.time_left() * 1000), 1)
+                timeout = min(timeout, until_flush) if timeout else until_flush
+            self._observe_input()
+            event = pygame.event.wait(timeout)
+            if event.type != pygame.NOEVENT:
+                pygame.event.post(event)
+            self._observe_input()
+
+        # The window contents may have been lost, so the frame has to be drawn again
+        if pygame.event.peek(EXPOSE_EVENTS):
+            self.dirty = True
+
     async def run(self) -> None:
         """Run game loop"""
+        # With late pacing the wait comes first, so input is as fresh as possible when it's used.
+        # Event-driven views already react to input as soon as it arrives.
+        wait_first = FRAME_PACING == "late" and not self.event_driven
+        frames_since_gc = 0
+
         while self.active:
+            if wait_first:
+                self._wait_for_frame()
+            elif self.event_driven:
+                self._wait_for_input()
+
+            frame_start = time.perf_counter()
+            if DEBUG_ALLOCATIONS:
+                allocations.frame_begin()
+
             self.process_input()
             self.update()
-            self.render()
-            self.clock.tick(FPS)
+
+            rendered = not self.event_driven or (self.dirty and self.active)
+            if rendered:
+                self.render()
+                self.dirty = False
+
+            if rendered and self.capture:
+                self.capture.grab(self.screen)
+
+            if DEBUG_ALLOCATIONS:
+                allocations.frame_end()
+
+            if self.metrics:
+                self.metrics.frame(time.perf_counter() - frame_start)
+                if self.metrics.window_due():
+                    self.report_metrics(self.metrics)
+                    self.metrics.flush()
+
+            # While the view manager has paused garbage collection, young objects are still
+            # collected every few seconds. Counted in frames, so it happens even if every frame is late.
+            if not gc.isenabled():
+                frames_since_gc += 1
+                if frames_since_gc >= GC_YOUNG_INTERVAL * FPS:
+                    frames_since_gc = 0
+                    gc.collect(0)
+
+            self.scheduler.run(frame_start)
+            if not wait_first:
+                self._wait_for_frame()
             await asyncio.sleep(0)
 
     def exit(self) -> None:
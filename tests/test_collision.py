@@ -0,0 +1,54 @@
+"""Collision tables have to agree with comparing the masks"""
+
+from random import Random
+import pytest
+from src.collision import (
+    OBSTACLE_SIZE,
+    PLAYER_SIZE,
+    CollisionTables,
+    build_contact_table,
+    swept_collide,
+)
+from src.snapshot import OBSTACLE_SKINS
+from src.sprites import Obstacle, Player
+from src.sprites.gameobject import load_sprite_image
+from src.config import LEVELS
+from src.utils import asset_path
+
+CARS = ["NES-car.png", "racing-blue-car.png"]
+
+
+@pytest.mark.parametrize("car", CARS)
+def test_tables_match_masks(car: str) -> None:
+    tables = CollisionTables(None)
+    player = Player(asset_path(f"sprites/cars/{car}"), LEVELS["normal"])
+    rng = Random(car)
+
+    for obstacle_path in OBSTACLE_SKINS:
+        obstacle = Obstacle((0, 0), 1, obstacle_path)
+
+        for _ in range(3000):
+            obstacle.rect.x = player.rect.x + rng.randint(-70, 80)
+            obstacle.rect.y = player.rect.y + rng.randint(-70, 100)
+            distance = rng.choice([0, 1, 3, 10, 40, 200])
+
+            contact = tables.collide(player, obstacle, distance)
+            assert (contact is not None) == swept_collide(player, obstacle, distance)
+            if contact is not None:
+                assert player.mask.get_at(contact)
+
+
+def test_task_builds_the_same_tables() -> None:
+    tables = CollisionTables(None)
+    player_path = asset_path("sprites/cars/NES-car.png")
+
+    for _ in tables.task(player_path):
+        pass
+
+    player_mask = load_sprite_image(player_path, PLAYER_SIZE)[1]
+    assert tables.built == len(OBSTACLE_SKINS)
+    for obstacle_path in OBSTACLE_SKINS:
+        obstacle_mask = load_sprite_image(obstacle_path, OBSTACLE_SIZE)[1]
+        assert tables.get(player_path, obstacle_path) == build_contact_table(
+            player_mask, obstacle_mask
+        )
@@ -0,0 +1,93 @@
+"""Generated traffic has to leave the player a way past every obstacle"""
+
+from bisect import bisect_left, bisect_right
+import pytest
+from src.collision import swept_collide
+from src.sprites import Obstacle
+from src.views.game import GameSpriteManager
+
+ROAD_LENGTH = 20000
+
+
+def obstacles_ahead(sprites: GameSpriteManager, speed: int) -> list[Obstacle]:
+    """Plan ROAD_LENGTH of road at a constant speed, and place its obstacles at their distance"""
+    traffic = sprites.traffic
+    traffic.speed = speed
+    while traffic.planned_until < ROAD_LENGTH:
+        traffic.generate_segment()
+
+    obstacles = []
+    for planned in sorted(traffic.queue):
+        if planned.kind == "obstacle":
+            position = (sprites._lane_x(planned.lane, 64), planned.distance)
+            obstacles.append(Obstacle(position, planned.lane, planned.skin))
+
+    return obstacles
+
+
+def crashed_at(sprites: GameSpriteManager, speed: int) -> int | None:
+    """Play every way of steering at once, frame by frame like GameSession does.
+    Returns the distance at which every way has crashed, or None if one got through."""
+    player = sprites.player
+    obstacles = obstacles_ahead(sprites, speed)
+    distances = [obstacle.rect.y for obstacle in obstacles]
+
+    # lane, x, switching_lane, moving_to
+    states = {(player.lane, player.rect.x, player.switching_lane, player._moving_to)}
+    distance = 0
+
+    while distance < ROAD_LENGTH:
+        distance += speed
+
+        # Only obstacles close to the player can hit it
+        first = bisect_left(distances, distance - 600)
+        last = bisect_right(distances, distance)
+        nearby = obstacles[first:last]
+        for obstacle, planned_distance in zip(nearby, distances[first:last]):
+            obstacle.rect.y = distance - planned_distance
+
+        next_states = set()
+        for state in states:
+            for steer in (None, player.move_left, player.move_right):
+                player.lane, player.rect.x, player.switching_lane, player._moving_to = (
+                    state
+                )
+                if steer:
+                    steer()
+                player.update()
+
+                if not any(
+                    swept_collide(player, obstacle, speed) for obstacle in nearby
+                ):
+                    next_states.add(
+                        (
+                            player.lane,
+                            player.rect.x,
+                            player.switching_lane,
+                            player._moving_to,
+                        )
+                    )
+
+        if not next_states:
+            return distance
+        states = next_states
+
+    return None
+
+
+@pytest.mark.parametrize("difficulty", ["easy", "normal", "hard"])
+@pytest.mark.parametrize("speed", [3, 10, 15])
+@pytest.mark.parametrize("seed", range(3))
+def test_traffic_is_passable(difficulty: str, speed: int, seed: int) -> None:
+    sprites = GameSpriteManager({"difficulty": difficulty, "car": "NES-car.png"})
+    sprites.rng.seed(seed)
+
+    assert crashed_at(sprites, speed) is None
+
+
+def test_hard_traffic_still_has_obstacles() -> None:
+    """The check shouldn't make the road empty"""
+    sprites = GameSpriteManager({"difficulty": "hard", "car": "NES-car.png"})
+    sprites.rng.seed(2)
+
+    assert len(obstacles_ahead(sprites, 10)) > ROAD_LENGTH / 1000